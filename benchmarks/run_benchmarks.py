@@ -0,0 +1,263 @@
+"""
+Benchmarks for the ingest and reporting hot paths on seeded synthetic data.
+
+    python benchmarks/run_benchmarks.py [--scale 1k|100k|1M] [--only STAGE,...] [--save-baseline]
+
+Each stage reports throughput, p50/p99 latency (per item, or per call for
+batch stages) and peak traced memory. Results land in benchmarks/results/;
+with --save-baseline they also become the baseline that later runs at the
+same scale are compared against.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import daily_brief  # noqa: E402
+import jobs_fetch  # noqa: E402
+import reports  # noqa: E402
+import signal_archive  # noqa: E402
+import signals as signal_store  # noqa: E402
+import skill_pairs  # noqa: E402
+import synthetic  # noqa: E402
+import trend_evolution  # noqa: E402
+import trend_store  # noqa: E402
+import weekly_cxo_synthesis  # noqa: E402
+from signal_record import SignalRecord  # noqa: E402
+from time_index import TimeIndex  # noqa: E402
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SEED = 20260822
+BATCH_REPEATS = 5
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def measure_items(fn, items):
+    """Per-item latency over items, then a traced pass for peak memory."""
+    lat = []
+    t_start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter_ns()
+        fn(item)
+        lat.append(time.perf_counter_ns() - t0)
+    wall = time.perf_counter() - t_start
+
+    tracemalloc.start()
+    for item in items:
+        fn(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    lat.sort()
+    return {
+        "items": len(items),
+        "wall_s": wall,
+        "throughput_per_s": len(items) / wall if wall else 0.0,
+        "p50_us": percentile(lat, 0.50) / 1e3,
+        "p99_us": percentile(lat, 0.99) / 1e3,
+        "peak_mem_mb": peak / 1e6,
+    }
+
+def measure_batch(fn, items_per_call, repeats=BATCH_REPEATS):
+    """Whole-call latency over repeats; throughput is items per second."""
+    lat = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        fn()
+        lat.append(time.perf_counter_ns() - t0)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    lat.sort()
+    mean_s = sum(lat) / len(lat) / 1e9
+    return {
+        "items": items_per_call,
+        "wall_s": sum(lat) / 1e9,
+        "throughput_per_s": items_per_call / mean_s if mean_s else 0.0,
+        "p50_us": percentile(lat, 0.50) / 1e3,
+        "p99_us": percentile(lat, 0.99) / 1e3,
+        "peak_mem_mb": peak / 1e6,
+    }
+
+# ---- STAGES ----
+
+def bench_normalise_greenhouse(n, tmp):
+    jobs = synthetic.greenhouse_payload(SEED, n)["jobs"]
+    return measure_items(lambda job: jobs_fetch.normalise_job("Synthetic", "midcap", "greenhouse", job), jobs)
+
+def bench_normalise_lever(n, tmp):
+    jobs = synthetic.lever_payload(SEED, n)
+    return measure_items(lambda job: jobs_fetch.normalise_job("Synthetic", "largecap", "lever", job), jobs)
+
+def bench_normalise_pool(n, tmp):
+    # whole-batch throughput of the process-pool path, one worker per core
+    jobs = synthetic.greenhouse_payload(SEED, n)["jobs"]
+    chunks = [jobs[i:i + jobs_fetch.NORMALISE_CHUNK] for i in range(0, len(jobs), jobs_fetch.NORMALISE_CHUNK)]
+    with jobs_fetch.make_process_pool(os.cpu_count() or 1) as procs:
+        def normalise_all():
+            futures = [procs.submit(jobs_fetch.normalise_chunk, "Synthetic", "midcap", "greenhouse", c) for c in chunks]
+            return [f.result() for f in futures]
+        normalise_all()   # warm up: spawn workers outside the timing
+        return measure_batch(normalise_all, n, repeats=3)
+
+def bench_match_job_text(n, tmp):
+    jobs = synthetic.greenhouse_payload(SEED, n)["jobs"]
+    blobs = [f"{j['title']}\n{j['departments'][0]['name']}\n{j['location']['name']}\n{j['content']}" for j in jobs]
+    return measure_items(jobs_fetch.match_job_text, blobs)
+
+def bench_detect_themes(n, tmp):
+    registry = json.loads((ROOT / trend_evolution.THEME_FILE).read_text(encoding="utf-8"))
+    matcher = trend_evolution.build_theme_matcher(registry)
+    texts = [f"{s['title']} {s['snippet']}" for s in synthetic.signals(SEED, n)]
+    return measure_items(lambda text: trend_evolution.detect_themes(text, registry, matcher), texts)
+
+def _archive(n, tmp):
+    root = Path(tmp) / "archive"
+    if not root.exists():
+        sigs = synthetic.signals(SEED, n)
+        for stream in ("ats_largecap", "ats_midcap", "rss"):
+            part = [s for s in sigs if _stream_for(s) == stream]
+            signal_archive.append_signals(stream, part, root=str(root))
+    return root
+
+def _stream_for(sig):
+    if sig["source_channel"] == "ats_jobs":
+        return f"ats_{sig['segment']}"
+    return "rss"
+
+def bench_archive_append(n, tmp):
+    sigs = synthetic.signals(SEED + 1, n)
+    counter = iter(range(1_000_000))
+    def append():
+        root = Path(tmp) / f"append-{next(counter)}"
+        signal_archive.append_signals("bench", sigs, root=str(root))
+    return measure_batch(append, n, repeats=3)
+
+def bench_load_signals(n, tmp):
+    root = _archive(n, tmp)
+    db = Path(tmp) / "signals.db"
+    conn = signal_store.connect(db_path=str(db), archive_root=str(root))
+    last = conn.execute("SELECT MAX(captured_at) FROM signals").fetchone()[0]
+    end = datetime.fromisoformat(last).date()
+    week = signal_store.signals_between(end - timedelta(days=7), end, conn=conn)
+    return measure_batch(lambda: signal_store.signals_between(end - timedelta(days=7), end, conn=conn), len(week))
+
+def bench_store_sync(n, tmp):
+    root = _archive(n, tmp)
+    counter = iter(range(1_000_000))
+    def cold_sync():
+        conn = signal_store.connect(db_path=str(Path(tmp) / f"cold-{next(counter)}.db"), archive_root=str(root))
+        conn.close()
+    return measure_batch(cold_sync, n, repeats=2)
+
+def bench_reports(n, tmp):
+    skill_pairs.CACHE_FILE = str(Path(tmp) / "skill_pairs_cache.json")
+    # reports see what the loaders return: compact records
+    sigs = [SignalRecord.from_dict(s) for s in synthetic.signals(SEED, n)]
+    index = TimeIndex(sigs)
+    as_of = index.times[-1].date()
+    week = index.last_days(weekly_cxo_synthesis.WINDOW_DAYS, as_of)
+    def render():
+        sections = daily_brief.build_sections(index.last_days(daily_brief.WINDOW_DAYS, as_of), as_of)[0]
+        reports.render(daily_brief.TEMPLATE_FILE, {**sections, "date": as_of.isoformat()})
+        sections = weekly_cxo_synthesis.build_sections(week)[0]
+        reports.render(weekly_cxo_synthesis.TEMPLATE_FILE, {**sections, "week_ending": as_of.isoformat()})
+    return measure_batch(render, len(week))
+
+def bench_skill_pairs(n, tmp, cached=True):
+    # a week's co-occurrence: summed from cached days, or rebuilt from scratch
+    index = TimeIndex([SignalRecord.from_dict(s) for s in synthetic.signals(SEED, n)])
+    week = index.last_days(weekly_cxo_synthesis.WINDOW_DAYS, index.times[-1].date())
+    cache = str(Path(tmp) / "skill_pairs_bench.json") if cached else ""
+    skill_pairs.window(week, cache_file=cache)
+    return measure_batch(lambda: skill_pairs.window(week, cache_file=cache), len(week))
+
+def bench_time_index(n, tmp):
+    sigs = synthetic.signals(SEED, n)
+    return measure_batch(lambda: TimeIndex(sigs), n, repeats=3)
+
+def bench_trend_history(n, tmp):
+    # n signals ~ n / 1000 weeks of history, at least a few years' worth
+    weeks = max(156, n // 1000)
+    registry = json.loads((ROOT / trend_evolution.THEME_FILE).read_text(encoding="utf-8"))
+    history = synthetic.trend_history(SEED, weeks, list(registry))
+    root = Path(tmp) / "trend_history"
+    for key, themes in history:
+        trend_store.upsert_week(key, themes, root=str(root))
+    first, last = history[0][0], history[-1][0]
+    return measure_batch(lambda: trend_store.load_range(first, last, root=str(root)), weeks)
+
+STAGES = {
+    "normalise_greenhouse": bench_normalise_greenhouse,
+    "normalise_lever": bench_normalise_lever,
+    "normalise_pool": bench_normalise_pool,
+    "match_job_text": bench_match_job_text,
+    "detect_themes": bench_detect_themes,
+    "archive_append": bench_archive_append,
+    "store_sync": bench_store_sync,
+    "load_signals_week": bench_load_signals,
+    "time_index_build": bench_time_index,
+    "report_render": bench_reports,
+    "skill_pairs_week": bench_skill_pairs,
+    "skill_pairs_week_cold": lambda n, tmp: bench_skill_pairs(n, tmp, cached=False),
+    "trend_history_range": bench_trend_history,
+}
+
+# ---- RUNNER ----
+
+def compare(results, baseline):
+    print("\nvs baseline (throughput):")
+    for name, r in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if not base or not base["throughput_per_s"]:
+            continue
+        delta = (r["throughput_per_s"] / base["throughput_per_s"] - 1) * 100
+        flag = "  <-- regression" if delta < -10 else ""
+        print(f"  {name:22s} {delta:+7.1f}%{flag}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    scale = argv[argv.index("--scale") + 1] if "--scale" in argv else "1k"
+    if scale not in SCALES:
+        raise SystemExit(f"unknown scale {scale}; choose from {', '.join(SCALES)}")
+    only = argv[argv.index("--only") + 1].split(",") if "--only" in argv else list(STAGES)
+    n = SCALES[scale]
+
+    os.chdir(ROOT)   # report stages read their templates from the repo root
+    results = {"scale": scale, "n": n, "seed": SEED, "run_at": datetime.utcnow().isoformat(), "stages": {}}
+    print(f"{'stage':22s} {'items':>9s} {'items/s':>12s} {'p50 us':>11s} {'p99 us':>11s} {'peak MB':>9s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in only:
+            r = STAGES[name](n, tmp)
+            results["stages"][name] = r
+            print(f"{name:22s} {r['items']:9d} {r['throughput_per_s']:12.0f} {r['p50_us']:11.1f} {r['p99_us']:11.1f} {r['peak_mem_mb']:9.1f}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    (RESULTS_DIR / f"{scale}-{stamp}.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline_file = RESULTS_DIR / f"baseline-{scale}.json"
+    if "--save-baseline" in argv:
+        baseline_file.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nbaseline saved -> {baseline_file}")
+    elif baseline_file.exists():
+        compare(results, json.loads(baseline_file.read_text(encoding="utf-8")))
+
+if __name__ == "__main__":
+    main()
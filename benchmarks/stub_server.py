@@ -0,0 +1,281 @@
+"""
+Local stand-in for the Greenhouse, Lever and RSS endpoints the fetchers call.
+
+    python benchmarks/stub_server.py serve [--port 8765] [options]
+    python benchmarks/stub_server.py load BOARDS [options]
+
+Point the fetchers at it with FETCH_BASE_URL=http://127.0.0.1:8765 (see
+endpoints.py). Requests arrive as /<upstream host>/<path>:
+
+    /boards-api.greenhouse.io/v1/boards/<token>/jobs   Greenhouse board
+    /api.lever.co/v0/postings/<org>?skip=&limit=       Lever postings
+    anything else                                      RSS 2.0 feed
+
+Payloads are synthetic (seeded by path, so the same board always gets the
+same postings and ETag), replayed from --replay DIR, or fetched from the real
+host once and saved with --record DIR. Options:
+
+    --latency S --jitter S      delay before every response
+    --jobs N --paragraphs N     postings per board and their length
+    --entries N                 items per RSS feed
+    --error-rate P --status C   answer status C (default 503) with probability P
+    --retry-after V             send Retry-After: V with those errors
+    --hang-rate P               never answer, so clients hit their timeout
+    --truncate-rate P           cut the body off half way
+    --no-length                 omit Content-Length (forces the streaming path)
+    --seed N
+
+`load` starts the server in-process, writes BOARDS Greenhouse and BOARDS
+Lever targets, runs jobs_fetch.process_targets against them and prints a
+summary of the run's metrics.
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+from xml.sax.saxutils import escape
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import endpoints  # noqa: E402
+import metrics  # noqa: E402
+import signal_archive  # noqa: E402
+import synthetic  # noqa: E402
+
+DEFAULTS = {
+    "port": 8765, "latency": 0.0, "jitter": 0.0, "jobs": 50, "paragraphs": 6, "entries": 20,
+    "error_rate": 0.0, "status": 503, "hang_rate": 0.0, "truncate_rate": 0.0,
+    "no_length": False, "retry_after": None, "replay": None, "record": None, "seed": 1,
+}
+HANG_SECONDS = 300
+LAST_MODIFIED = "Sat, 22 Aug 2026 00:00:00 GMT"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# ---- PAYLOADS ----
+
+def path_seed(path, seed):
+    return int(hashlib.sha1(f"{seed}:{path}".encode("utf-8")).hexdigest()[:8], 16)
+
+@lru_cache(maxsize=4096)
+def greenhouse_body(path, jobs, paragraphs, seed):
+    return json.dumps(synthetic.greenhouse_payload(path_seed(path, seed), jobs, paragraphs)).encode("utf-8")
+
+@lru_cache(maxsize=4096)
+def lever_postings(path, jobs, paragraphs, seed):
+    return synthetic.lever_payload(path_seed(path, seed), jobs, paragraphs)
+
+def lever_body(path, query, cfg):
+    postings = lever_postings(path, cfg["jobs"], cfg["paragraphs"], cfg["seed"])
+    if "limit" in query:
+        skip = int(query.get("skip", 0))
+        postings = postings[skip:skip + int(query["limit"])]
+    return json.dumps(postings).encode("utf-8")
+
+@lru_cache(maxsize=4096)
+def rss_body(path, entries, seed):
+    rng = random.Random(path_seed(path, seed))
+    items = []
+    for i in range(entries):
+        e = synthetic.rss_entry(rng, i)
+        items.append(f"<item><title>{escape(e['title'])}</title><link>{escape(e['link'])}</link>"
+                     f"<description>{escape(e['summary'])}</description></item>")
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Stub feed {escape(path)}</title>{''.join(items)}</channel></rss>").encode("utf-8")
+
+def synthetic_payload(host, path, query, cfg):
+    if path.startswith("/v1/boards/"):
+        return "application/json", greenhouse_body(path, cfg["jobs"], cfg["paragraphs"], cfg["seed"])
+    if path.startswith("/v0/postings/"):
+        return "application/json", lever_body(path, query, cfg)
+    return "application/rss+xml", rss_body(f"/{host}{path}", cfg["entries"], cfg["seed"])
+
+def recording_path(directory, host, target):
+    return Path(directory) / f"{hashlib.sha1(f'{host}{target}'.encode('utf-8')).hexdigest()[:16]}.json"
+
+def recorded_payload(host, target, cfg):
+    """(status, content type, body) from --replay / --record, or None."""
+    directory = cfg["replay"] or cfg["record"]
+    path = recording_path(directory, host, target)
+    if not path.exists():
+        if not cfg["record"]:
+            return None
+        r = requests.get(f"https://{host}{target}", timeout=30)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "url": f"https://{host}{target}", "status": r.status_code,
+            "content_type": r.headers.get("Content-Type", ""), "body": r.text,
+        }), encoding="utf-8")
+    rec = json.loads(path.read_text(encoding="utf-8"))
+    return rec["status"], rec["content_type"], rec["body"].encode("utf-8")
+
+# ---- SERVER ----
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def roll(self):
+        with self.server.lock:
+            return self.server.rng.random()
+
+    def do_GET(self):
+        cfg = self.server.cfg
+        parts = urlsplit(self.path)
+        host, _, rest = parts.path.lstrip("/").partition("/")
+        path = "/" + rest
+        target = f"{path}?{parts.query}" if parts.query else path
+
+        delay = cfg["latency"] + (self.roll() * cfg["jitter"] if cfg["jitter"] else 0.0)
+        if delay:
+            time.sleep(delay)
+        if cfg["hang_rate"] and self.roll() < cfg["hang_rate"]:
+            time.sleep(HANG_SECONDS)
+            return
+        if cfg["error_rate"] and self.roll() < cfg["error_rate"]:
+            headers = {"Retry-After": cfg["retry_after"]} if cfg["retry_after"] else None
+            return self.reply(cfg["status"], "text/plain", f"injected {cfg['status']}\n".encode("utf-8"), headers)
+
+        if cfg["replay"] or cfg["record"]:
+            recorded = recorded_payload(host, target, cfg)
+            if recorded is None:
+                return self.reply(404, "text/plain", b"no recording\n")
+            status, ctype, body = recorded
+        else:
+            status = 200
+            ctype, body = synthetic_payload(host, path, dict(parse_qsl(parts.query)), cfg)
+
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            return self.reply(304, None, b"", {"ETag": etag})
+        truncate = cfg["truncate_rate"] and self.roll() < cfg["truncate_rate"]
+        self.reply(status, ctype, body, {"ETag": etag, "Last-Modified": LAST_MODIFIED}, truncate=truncate)
+
+    def reply(self, status, ctype, body, headers=None, truncate=False):
+        self.send_response(status)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if self.server.cfg["no_length"] or truncate:
+            # the body then ends when the connection closes
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        else:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body[:len(body) // 2] if truncate else body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+def make_server(cfg, port=None):
+    server = ThreadingHTTPServer(("127.0.0.1", cfg["port"] if port is None else port), StubHandler)
+    server.daemon_threads = True
+    server.cfg = cfg
+    server.rng = random.Random(cfg["seed"])
+    server.lock = threading.Lock()
+    return server
+
+# ---- LOAD TEST ----
+
+def write_targets(path, boards):
+    targets = {
+        "segment": "load",
+        "greenhouse": [{"name": f"Stub GH {i}", "board_url": f"https://boards.greenhouse.io/stub{i}"}
+                       for i in range(boards)],
+        "lever": [{"name": f"Stub Lever {i}", "api_url": f"https://api.lever.co/v0/postings/stub{i}?mode=json"}
+                  for i in range(boards)],
+    }
+    Path(path).write_text(json.dumps(targets), encoding="utf-8")
+
+def load(boards, cfg):
+    server = make_server(cfg, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ[endpoints.ENV_VAR] = f"http://127.0.0.1:{server.server_port}"
+    import jobs_fetch
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)   # process_targets archives into ./archive
+        try:
+            write_targets("targets.json", boards)
+            metrics.reset()
+            t0 = time.perf_counter()
+            with metrics.stage("jobs_fetch"):
+                jobs_fetch.process_targets("targets.json", "signals.jsonl.gz", state={})
+            wall = time.perf_counter() - t0
+            signals = list(signal_archive.read_snapshot("signals.jsonl.gz"))
+        finally:
+            os.chdir(cwd)
+    server.shutdown()
+
+    snap = metrics.snapshot()
+    errors = sum(1 for s in signals if s.get("source_type") == "error")
+    distinct = len({signal_archive.signal_id(s) for s in signals if s.get("source_type") != "error"})
+    counts = snap["stages"]["jobs_fetch"]["counts"]
+    print(f"{2 * boards} boards in {wall:.1f}s: {counts.get('records_in', 0)} postings, "
+          f"{len(signals) - errors} signals ({distinct} distinct), {errors} board errors")
+    for host, rec in snap["hosts"].items():
+        mean = rec["latency_sum_s"] / rec["requests"] if rec["requests"] else 0.0
+        print(f"  {host}: {rec['requests']} requests, {rec['bytes'] / 1e6:.1f} MB, "
+              f"mean {mean * 1000:.0f} ms to headers, status {rec['status']}, policy {rec['events']}")
+    slowest = sorted(snap["boards"].items(), key=lambda kv: kv[1]["wall_s"], reverse=True)[:5]
+    print("  slowest boards: " + ", ".join(f"{label} {rec['wall_s']:.2f}s" for label, rec in slowest))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"load-{boards}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    out.write_text(json.dumps({"boards": 2 * boards, "wall_s": wall, "config": cfg, "metrics": snap}, indent=2),
+                   encoding="utf-8")
+    print(f"metrics -> {out}")
+
+# ---- CLI ----
+
+def parse_options(argv):
+    cfg = dict(DEFAULTS)
+    for key, default in DEFAULTS.items():
+        flag = "--" + key.replace("_", "-")
+        if flag not in argv:
+            continue
+        if isinstance(default, bool):
+            cfg[key] = True
+            continue
+        i = argv.index(flag)
+        if i + 1 >= len(argv):
+            raise SystemExit(f"{flag} needs a value")
+        value = argv[i + 1]
+        cfg[key] = type(default)(value) if default is not None else value
+    return cfg
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cfg = parse_options(argv)
+    if argv[:1] == ["load"] and len(argv) > 1:
+        load(int(argv[1]), cfg)
+    elif argv[:1] == ["serve"]:
+        server = make_server(cfg)
+        print(f"stub server on http://127.0.0.1:{server.server_port} "
+              f"(export {endpoints.ENV_VAR}=http://127.0.0.1:{server.server_port})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(__doc__)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import html
+import random
+import re
+from datetime import datetime, timedelta
+
+# Seeded generators for payloads shaped like the real inputs: Greenhouse and
+# Lever job postings, RSS entries, normalised signals and trend history.
+# Same seed, same data, so runs are comparable.
+
+TITLES = [
+    "Software Engineer", "Senior Data Analyst", "Product Manager", "Account Executive",
+    "Machine Learning Engineer", "UX Designer", "HR Business Partner", "GenAI Solutions Architect",
+    "Customer Success Manager", "Finance Controller", "Prompt Engineer", "Platform Engineer",
+]
+TEAMS = ["Engineering", "Data", "Product", "Sales", "Design", "People", "Finance", "Operations"]
+LOCATIONS = [
+    "Bengaluru, India", "Mumbai, India", "Gurugram, India", "Pune, India", "Hyderabad, India",
+    "Remote", "London, UK", "Singapore", "Dubai, United Arab Emirates", "San Francisco, CA",
+]
+FILLER = (
+    "We are looking for someone who enjoys working across teams and owning outcomes. "
+    "You will partner with stakeholders, write clear documents and ship iteratively. "
+    "Our benefits include flexible hours, learning budgets and health cover. "
+)
+SKILL_PHRASES = [
+    "experience with LLMs and prompt design", "RAG pipelines and retrieval", "Python and SQL",
+    "Power BI or Tableau dashboards", "AI governance and model risk", "guardrails and evaluation",
+    "change management and enablement", "responsible AI practices", "agents and orchestration",
+    "product management for ML features", "training programmes for frontline teams",
+]
+NEWS_HEADLINES = [
+    "Indian IT firms double down on GenAI training", "Regulator publishes draft AI governance rules",
+    "Startups race to build AI agents for enterprise workflows", "Midcaps hire for AI enablement roles",
+    "Banks tighten model risk controls", "Design teams rethink craft with AI copilots",
+]
+FEEDS = ["Mint - Tech", "ET - Tech", "Business Standard - Tech", "MIT Tech Review", "McKinsey"]
+ORGS = ["Postman", "Freshworks", "Groww", "Zerodha", "Razorpay", "Swiggy", "PhonePe", "Meesho", "Chargebee"]
+
+def description(rng, paragraphs=6, skill_rate=0.4):
+    parts = []
+    for _ in range(paragraphs):
+        text = FILLER
+        if rng.random() < skill_rate:
+            text += f"Bonus points for {rng.choice(SKILL_PHRASES)}. "
+        parts.append(f"<p><strong>{rng.choice(TEAMS)}</strong> {text}</p>")
+    return html.escape("<div class=\"content-intro\">" + "".join(parts) + "</div>")
+
+# ids and links depend on the board's seed as well as the posting's index,
+# so boards generated with different seeds never share a posting
+def greenhouse_job(rng, i, paragraphs=6, seed=0):
+    job_id = 4000000 + seed * 100000 + i
+    return {
+        "id": job_id,
+        "title": rng.choice(TITLES),
+        "location": {"name": rng.choice(LOCATIONS)},
+        "absolute_url": f"https://job-boards.greenhouse.io/synthetic-{seed:x}/jobs/{job_id}",
+        "updated_at": f"2026-08-{1 + i % 28:02d}T10:00:00-04:00",
+        "departments": [{"name": rng.choice(TEAMS)}],
+        "content": description(rng, paragraphs),
+    }
+
+def lever_job(rng, i, paragraphs=6, seed=0):
+    job_id = f"lever-{seed:x}-{i:08d}"
+    return {
+        "id": job_id,
+        "text": rng.choice(TITLES),
+        "title": rng.choice(TITLES),
+        "categories": {"location": rng.choice(LOCATIONS), "team": rng.choice(TEAMS)},
+        "hostedUrl": f"https://jobs.lever.co/synthetic-{seed:x}/{job_id}",
+        "createdAt": 1750000000000 + i,
+        # like Lever's: text, one paragraph per line
+        "descriptionPlain": re.sub(r"<[^>]*>", "", html.unescape(description(rng, paragraphs)).replace("</p>", "\n")),
+    }
+
+def greenhouse_payload(seed, n, paragraphs=6):
+    rng = random.Random(seed)
+    return {"jobs": [greenhouse_job(rng, i, paragraphs, seed) for i in range(n)], "meta": {"total": n}}
+
+def lever_payload(seed, n, paragraphs=6):
+    rng = random.Random(seed)
+    return [lever_job(rng, i, paragraphs, seed) for i in range(n)]
+
+def rss_entry(rng, i):
+    return {
+        "title": f"{rng.choice(NEWS_HEADLINES)} ({i})",
+        "summary": FILLER + rng.choice(SKILL_PHRASES),
+        "link": f"https://news.example.com/story/{i}",
+    }
+
+def signals(seed, n, start=datetime(2024, 1, 1), days=365 * 2):
+    """Normalised signals spread evenly over `days` from `start`."""
+    rng = random.Random(seed)
+    step = timedelta(days=days) / max(n, 1)
+    out = []
+    for i in range(n):
+        job = rng.random() < 0.8
+        segment = rng.choice(["largecap", "midcap"]) if job else None
+        sig = {
+            "captured_at": (start + step * i).isoformat(),
+            "source_channel": "ats_jobs" if job else "rss",
+            "source_type": "job_posting" if job else "news",
+            "geo_primary": rng.choice(["India", "Global"]),
+            "india_relevance": rng.choice(["High", "Medium"]),
+            "org_name": rng.choice(ORGS) if job else "",
+            "industry": "",
+            "role_or_skill_hint": "",
+            "title": rng.choice(TITLES) if job else rng.choice(NEWS_HEADLINES),
+            "snippet": FILLER[:150] + rng.choice(SKILL_PHRASES),
+            "link": f"https://example.com/{'jobs' if job else 'news'}/{i}",
+            "evidence_weight": 5 if job else 3,
+            "notes": (f"greenhouse; location={rng.choice(LOCATIONS)}; team={rng.choice(TEAMS)}; created_at=2026-08-01"
+                      if job else rng.choice(FEEDS)),
+        }
+        if job:
+            sig["segment"] = segment
+            sig["skill_hits"] = sorted(rng.sample(["python", "sql", "design", "governance", "prompt", "rag", "training"], rng.randint(0, 3)))
+            sig["ai_related"] = True
+        out.append(sig)
+    return out
+
+def trend_history(seed, weeks, themes, start=datetime(2020, 1, 6)):
+    """[(iso week key, themes dict)] for `weeks` consecutive weeks."""
+    rng = random.Random(seed)
+    out = []
+    for w in range(weeks):
+        d = (start + timedelta(weeks=w)).date()
+        year, week, _ = d.isocalendar()
+        counts = {}
+        for theme in themes:
+            large, mid = rng.randint(0, 80), rng.randint(0, 120)
+            counts[theme] = {"total": large + mid + rng.randint(0, 10), "largecap": large, "midcap": mid}
+        out.append((f"{year}-W{week:02d}", counts))
+    return out
@@ -1,49 +1,27 @@
-import json
 from datetime import datetime, timedelta
-from pathlib import Path
 
-TODAY = datetime.utcnow().date()
-WEEK_START = TODAY - timedelta(days=7)
+import metrics
+import reports
+import signals as signal_store
+import trend_store
+from time_index import TimeIndex, as_of_from_argv
 
-SIGNAL_FILES = [
-    "rss_signals.json",
-    "ats_jobs_largecap_signals.json",
-    "ats_jobs_midcap_signals.json"
-]
+WINDOW_DAYS = 8   # the week ending today, plus the same weekday last week
 
-TREND_HISTORY = "trend_history.json"
 TEMPLATE_FILE = "CONTRARIAN_TEMPLATE.md"
 OUTPUT_FILE = "contrarian_insights.md"
 
-def load_json(path, default):
-    if not Path(path).exists():
-        return default
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def is_this_week(sig):
-    try:
-        d = datetime.fromisoformat(sig.get("captured_at", "")).date()
-        return d >= WEEK_START
-    except Exception:
-        return False
-
-def main():
-    template = Path(TEMPLATE_FILE).read_text(encoding="utf-8")
-
-    # Load signals (this week)
-    signals = []
-    for f in SIGNAL_FILES:
-        signals.extend(load_json(f, []))
-    signals = [s for s in signals if is_this_week(s)]
+def latest_snapshot_week(as_of):
+    # latest trend snapshot at or before as_of's week (if available)
+    snapshots = trend_store.load_range(None, trend_store.week_key(as_of))
+    return snapshots[-1]["week"] if snapshots else "n/a"
 
+def build_sections(signals, latest_week):
+    """(sections, counts) for the notes over signals."""
+    metrics.count("contrarian_insights", records_in=len(signals))
     largecap = [s for s in signals if s.get("segment") == "largecap"]
     midcap = [s for s in signals if s.get("segment") == "midcap"]
 
-    # Load latest trend snapshot (if available)
-    history = load_json(TREND_HISTORY, [])
-    latest_week = history[-1]["week"] if history else "n/a"
-
     # Evidence snippets (light-touch; keep it robust)
     def evidence_line(hint):
         # returns a short “signals say” line based on counts + segments
@@ -91,25 +69,46 @@ def main():
         "Create a lightweight ‘manager playbook’: decision rights, review norms, escalation paths, and examples of good AI-assisted work."
     )
 
-    out = (
-        template
-        .replace("{{week_ending}}", TODAY.isoformat())
-        .replace("{{narrative_1_said}}", n1_said)
-        .replace("{{narrative_1_signals}}", n1_signals)
-        .replace("{{narrative_1_india}}", n1_india)
-        .replace("{{narrative_1_move}}", n1_move)
-        .replace("{{narrative_2_said}}", n2_said)
-        .replace("{{narrative_2_signals}}", n2_signals)
-        .replace("{{narrative_2_india}}", n2_india)
-        .replace("{{narrative_2_move}}", n2_move)
-        .replace("{{narrative_3_said}}", n3_said)
-        .replace("{{narrative_3_signals}}", n3_signals)
-        .replace("{{narrative_3_india}}", n3_india)
-        .replace("{{narrative_3_move}}", n3_move)
-    )
+    sections = {
+        "narrative_1_said": n1_said,
+        "narrative_1_signals": n1_signals,
+        "narrative_1_india": n1_india,
+        "narrative_1_move": n1_move,
+        "narrative_2_said": n2_said,
+        "narrative_2_signals": n2_signals,
+        "narrative_2_india": n2_india,
+        "narrative_2_move": n2_move,
+        "narrative_3_said": n3_said,
+        "narrative_3_signals": n3_signals,
+        "narrative_3_india": n3_india,
+        "narrative_3_move": n3_move,
+    }
+    counts = {
+        "signals": len(signals),
+        "largecap": len(largecap),
+        "midcap": len(midcap),
+        "trend_snapshot": latest_week,
+    }
+    return sections, counts
+
+def publish(sections, counts, as_of):
+    """Write the notes and their JSON artifact; returns the markdown."""
+    return reports.publish(OUTPUT_FILE, TEMPLATE_FILE, "contrarian_insights", as_of, sections, counts,
+                           week_ending=as_of.isoformat())
+
+def main(as_of=None):
+    as_of = as_of or datetime.utcnow().date()
 
-    Path(OUTPUT_FILE).write_text(out, encoding="utf-8")
+    # Load signals (this week)
+    start = as_of - timedelta(days=WINDOW_DAYS - 1)
+    signals = TimeIndex(signal_store.signals_between(start, as_of)).last_days(WINDOW_DAYS, as_of)
+
+    publish(*build_sections(signals, latest_snapshot_week(as_of)), as_of)
     print("Contrarian insights generated")
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("contrarian_insights"):
+            main(as_of_from_argv())
+    finally:
+        metrics.write()
@@ -1,53 +1,74 @@
-import json
 from datetime import datetime, timedelta
-from pathlib import Path
-from collections import Counter, defaultdict
-
-TODAY = datetime.utcnow().date()
-YESTERDAY = TODAY - timedelta(days=1)
-
-FILES = [
-    "rss_signals.json",
-    "ats_jobs_largecap_signals.json",
-    "ats_jobs_midcap_signals.json"
-]
-
-def load_signals():
-    signals = []
-    for f in FILES:
-        if Path(f).exists():
-            with open(f, "r", encoding="utf-8") as fh:
-                try:
-                    signals.extend(json.load(fh))
-                except Exception:
-                    pass
-    return signals
-
-def is_recent(sig):
-    try:
-        d = datetime.fromisoformat(sig.get("captured_at", "")).date()
-        return d >= YESTERDAY
-    except Exception:
-        return False
-
-def main():
-    signals = [s for s in load_signals() if is_recent(s)]
-
-    largecap = [s for s in signals if s.get("segment") == "largecap"]
-    midcap = [s for s in signals if s.get("segment") == "midcap"]
 
-    skill_counter = Counter()
-    for s in signals:
-        for sk in s.get("skill_hits", []):
-            skill_counter[sk] += 1
+import metrics
+import near_dupes
+import reports
+import signal_record
+import signals as signal_store
+import skill_pairs
+import trend_analytics
+from time_index import TimeIndex, as_of_from_argv
+
+WINDOW_DAYS = 2   # yesterday and today
+
+TEMPLATE_FILE = "DAILY_BRIEF_TEMPLATE.md"
+OUTPUT_FILE = "daily_brief.md"
+
+def load_signals(as_of):
+    # indexed window query; each signal once, at its latest capture
+    start = as_of - timedelta(days=WINDOW_DAYS - 1)
+    return TimeIndex(signal_store.signals_between(start, as_of))
+
+def baseline_note(trends):
+    # after a change of counting method the measures restart, and stay thin
+    # until enough weeks have been counted the new way
+    weeks = len(trends.cube.weeks)
+    if not trends.dropped or weeks > trend_analytics.MIN_Z_WEEKS:
+        return ""
+    return (
+        f"(Trend measures restart at {trends.cube.weeks[0]}, when weekly theme counts moved to one per "
+        f"near-duplicate cluster; the {trends.dropped} earlier weeks were counted per signal and are not "
+        f"compared with them. Week-on-week changes need 2 such weeks and anomaly scores "
+        f"{trend_analytics.MIN_Z_WEEKS + 1}; {weeks} so far.)"
+    )
 
-    # -------- Section 1: Strengthening trends --------
-    strengthening = (
+def strengthening_block(trends):
+    accelerating = trends.accelerating()
+    general = (
         "Across today’s signals, there is increasing evidence that AI-related work is shifting "
         "away from isolated experimentation toward more explicit role and capability design. "
         "This is visible through repeated hiring signals and organisational commentary that frame "
         "AI not as a tool to try, but as a capability to be embedded into day-to-day work."
     )
+    note = baseline_note(trends)
+    if note:
+        general = f"{general}\n\n{note}"
+    if not accelerating:
+        return general
+    lead = (
+        f"The weekly trend history (through {trends.latest_week}) shows momentum building in "
+        f"{', '.join(accelerating)}: signal counts rose week-on-week and the smoothed trend is pointing up."
+    )
+    spikes = [t for t, z in trends.anomalies() if z > 0]
+    if spikes:
+        lead += (
+            f" {spikes[0]} stands out, at {trends.latest('zscore', spikes[0]):.1f} standard deviations "
+            f"above its recent {trend_analytics.Z_WEEKS}-week baseline."
+        )
+    return f"{lead}\n\n{general}"
+
+def build_sections(signals, as_of):
+    """(sections, counts) for the brief over signals."""
+    metrics.count("daily_brief", records_in=len(signals))
+    largecap = [s for s in signals if s.get("segment") == "largecap"]
+    midcap = [s for s in signals if s.get("segment") == "midcap"]
+
+    # one count per near-duplicate cluster, not per syndicated copy
+    skill_counter = signal_record.skill_counts(near_dupes.representatives(signals))
+
+    # -------- Section 1: Strengthening trends --------
+    # themes named from the trend history's momentum, when there is any
+    strengthening = strengthening_block(trend_analytics.load(as_of))
 
     # -------- Section 2: Largecap vs Midcap divergence --------
     if largecap and midcap:
@@ -83,6 +104,12 @@ def main():
             "or fragmented experimentation across organisations."
         )
 
+    # which skills are asked for together, from the cached daily matrices
+    pairs = skill_pairs.window(signals)
+    pairs_text = skill_pairs.pairs_paragraph(pairs)
+    if pairs_text:
+        skill_block = f"{skill_block}\n\n{pairs_text}"
+
     # -------- Section 4: India-specific implications --------
     india_block = (
         "In the Indian context, these shifts carry specific implications. Budget sensitivity, large teams, "
@@ -108,21 +135,37 @@ def main():
         "- Case comparison: Midcap speed vs largecap safety in AI adoption"
     )
 
-    template = Path("DAILY_BRIEF_TEMPLATE.md").read_text(encoding="utf-8")
-
-    brief = (
-        template
-        .replace("{{date}}", TODAY.isoformat())
-        .replace("{{strengthening_themes}}", strengthening)
-        .replace("{{segment_differences}}", segment_diff)
-        .replace("{{skill_shifts}}", skill_block)
-        .replace("{{india_implications}}", india_block)
-        .replace("{{writing_angles}}", writing)
-        .replace("{{lab_inputs}}", lab_inputs)
-    )
-
-    Path("daily_brief.md").write_text(brief, encoding="utf-8")
+    sections = {
+        "strengthening_themes": strengthening,
+        "segment_differences": segment_diff,
+        "skill_shifts": skill_block,
+        "india_implications": india_block,
+        "writing_angles": writing,
+        "lab_inputs": lab_inputs,
+    }
+    counts = {
+        "signals": len(signals),
+        "largecap": len(largecap),
+        "midcap": len(midcap),
+        "top_skills": dict(skill_counter.most_common(5)),
+        "skill_pairs": skill_pairs.summary(pairs),
+    }
+    return sections, counts
+
+def publish(sections, counts, as_of):
+    """Write the brief and its JSON artifact; returns the markdown."""
+    return reports.publish(OUTPUT_FILE, TEMPLATE_FILE, "daily_brief", as_of, sections, counts,
+                           date=as_of.isoformat())
+
+def main(as_of=None):
+    as_of = as_of or datetime.utcnow().date()
+    signals = load_signals(as_of).last_days(WINDOW_DAYS, as_of)
+    publish(*build_sections(signals, as_of), as_of)
     print("Daily brief generated (analysis-led)")
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("daily_brief"):
+            main(as_of_from_argv())
+    finally:
+        metrics.write()
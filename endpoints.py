@@ -0,0 +1,24 @@
+import os
+from urllib.parse import urlsplit
+
+# Live API hosts can be redirected to a local stand-in (benchmarks/stub_server.py)
+# for offline and load tests:
+#   FETCH_BASE_URL=http://127.0.0.1:8765 python pipeline.py daily
+# sends https://boards-api.greenhouse.io/v1/boards/x/jobs?content=true to
+#       http://127.0.0.1:8765/boards-api.greenhouse.io/v1/boards/x/jobs?content=true
+# The original host stays in the path, so the stand-in knows which API shape
+# to serve (or which upstream to record from). Host-level limits and metrics
+# keep using the original URL.
+
+ENV_VAR = "FETCH_BASE_URL"
+
+def base_url():
+    return os.environ.get(ENV_VAR, "").rstrip("/")
+
+def resolve(url, base=None):
+    base = base_url() if base is None else base.rstrip("/")
+    if not base:
+        return url
+    parts = urlsplit(url)
+    path = f"/{parts.netloc}{parts.path}"
+    return f"{base}{path}?{parts.query}" if parts.query else f"{base}{path}"
@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+import metrics
+
+# Per-host fetch policy shared by jobs_fetch and rss_fetch:
+#   - a token bucket per host caps the request rate (bursts up to `burst`)
+#   - transient failures (connection errors, timeouts, 429, 5xx) are retried
+#     with jittered exponential backoff, or after the server's Retry-After
+#   - a circuit breaker per host opens after BREAKER_FAILURES consecutive
+#     failures; while open, requests to that host fail at once instead of
+#     each waiting out a timeout, and after BREAKER_COOLDOWN one trial
+#     request is let through to probe it
+
+MAX_ATTEMPTS = 3
+CONNECT_TIMEOUT = 6.0     # a host that will not accept a connection fails fast
+BACKOFF_BASE = 1.0        # seconds before the first retry (before jitter)
+BACKOFF_CAP = 20.0
+MAX_RETRY_AFTER = 60.0    # longer Retry-After values are not waited out
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30.0
+
+# requests per second and burst size, per host
+HOST_RATES = {
+    "boards-api.greenhouse.io": (5.0, 10),
+    "api.lever.co": (3.0, 6),
+}
+DEFAULT_RATE = (2.0, 4)
+
+class CircuitOpen(requests.RequestException):
+    """The host has been failing; the request was not sent."""
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class CircuitBreaker:
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            # half-open: one trial request per cooldown
+            if not self.trial and time.monotonic() - self.opened_at >= self.cooldown:
+                self.trial = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+_lock = threading.Lock()
+_buckets = {}
+_breakers = {}
+
+def host_state(host):
+    with _lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(*HOST_RATES.get(host, DEFAULT_RATE))
+            _breakers[host] = CircuitBreaker()
+        return _buckets[host], _breakers[host]
+
+def reset():
+    with _lock:
+        _buckets.clear()
+        _breakers.clear()
+
+def retry_after_seconds(value):
+    """Retry-After as delta-seconds or an HTTP date; None if unusable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff(attempt, retry_after=None):
+    """Delay before retry number attempt (0-based); full jitter unless the server said when."""
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def send(url, do_request, deadline=None):
+    """
+    Run do_request() (a GET of url) under the host's policy and return the
+    final response; a retryable status is returned as-is once attempts run
+    out. deadline (time.monotonic()) stops retries that could not finish.
+    """
+    host = urlparse(url).netloc
+    bucket, breaker = host_state(host)
+    for attempt in range(MAX_ATTEMPTS):
+        if not breaker.allow():
+            metrics.host_event(url, "circuit_open")
+            raise CircuitOpen(f"circuit open for {host}")
+        bucket.acquire()
+        last = attempt == MAX_ATTEMPTS - 1
+        try:
+            r = do_request()
+        except (requests.ConnectionError, requests.Timeout):
+            breaker.failure()
+            delay = backoff(attempt)
+            if last or (deadline and time.monotonic() + delay > deadline):
+                raise
+        except Exception:
+            # not retried, but still an outcome: a half-open breaker whose
+            # trial raised would otherwise stay closed to every later request
+            breaker.failure()
+            raise
+        else:
+            if r.status_code not in RETRY_STATUSES:
+                breaker.success()
+                return r
+            # a 429 means the host is up but wants us to slow down
+            if r.status_code == 429:
+                breaker.success()
+            else:
+                breaker.failure()
+            delay = backoff(attempt, retry_after_seconds(r.headers.get("Retry-After")))
+            if last or (deadline and time.monotonic() + delay > deadline):
+                return r
+            r.close()
+        metrics.host_event(url, "retry")
+        time.sleep(delay)
@@ -0,0 +1,71 @@
+import html
+import re
+
+# Plain text out of ATS job descriptions. Greenhouse sends entity-escaped HTML
+# ("&lt;p&gt;..."), Lever's description is raw HTML and its descriptionPlain
+# is already text (plain_text: whitespace only). HTML goes through one pass
+# that drops tags, unescapes the text between them and collapses whitespace.
+#
+# Cost is bounded by the caps, not by the input: only the first MAX_RAW_CHARS
+# of a description are read, the pass stops once it has `limit` characters,
+# and a tag is a tag name plus at most MAX_TAG_CHARS without another bracket,
+# so a stray "<" or "&lt;" in the text is kept as text and never sends the
+# tag pattern scanning to the end of the input.
+
+MAX_TEXT_CHARS = 12000   # matchable text kept per posting
+MAX_RAW_CHARS = MAX_TEXT_CHARS * 20
+MAX_TAG_CHARS = 2000
+SNIPPET_CHARS = 300
+
+# one form per input: a description with a raw tag near the start is raw
+# HTML (where "&lt;" is a literal "<"), otherwise escaped HTML
+_RAW_TAG = re.compile(rf"<[/!a-zA-Z][^<>]{{0,{MAX_TAG_CHARS}}}>")
+_ESCAPED_TAG = re.compile(rf"&lt;[/!a-zA-Z](?:[^&<>]|&(?![lg]t;)){{0,{MAX_TAG_CHARS}}}&gt;")
+# <script>/<style> open a block whose content is dropped up to the matching
+# close tag, looked for no further than the rest of the raw cap
+_SKIP_OPEN = re.compile(r"(&lt;|<)(script|style)\b", re.I)
+_SKIP_CLOSE = {
+    ("&lt;", name): re.compile(rf"&lt;/{name}\s*&gt;", re.I) for name in ("script", "style")
+}
+_SKIP_CLOSE.update({("<", name): re.compile(rf"</{name}\s*>", re.I) for name in ("script", "style")})
+
+def _clean(segment):
+    # twice: the first pass undoes Greenhouse's escaping, the second the
+    # entities that were inside the original markup (&amp;nbsp; -> &nbsp; -> " ")
+    return " ".join(html.unescape(html.unescape(segment)).split())
+
+def plain_text(raw, limit=MAX_TEXT_CHARS):
+    """Whitespace-collapsed text of a description that is already plain text."""
+    return " ".join((raw or "")[:limit * 2].split())[:limit]
+
+def extract_text(raw, limit=MAX_TEXT_CHARS):
+    """Whitespace-collapsed text of an HTML (or escaped HTML) fragment, at most limit chars."""
+    if not raw:
+        return ""
+    raw = raw[:MAX_RAW_CHARS]
+    if "<" not in raw and "&lt;" not in raw:
+        return _clean(raw[:limit * 2])[:limit]
+    tag = _ESCAPED_TAG if _RAW_TAG.search(raw, 0, limit * 2) is None else _RAW_TAG
+    parts, size, pos = [], 0, 0
+    unclosed = set()   # skip blocks with no close tag: kept as text
+    while size < limit:
+        m = tag.search(raw, pos)
+        end = m.start() if m else len(raw)
+        if end > pos:
+            # one text run never needs more than the tag-free path reads
+            text = _clean(raw[pos:min(end, pos + limit * 2)])
+            if text:
+                parts.append(text)
+                size += len(text) + 1
+        if m is None:
+            break
+        pos = m.end()
+        skip = _SKIP_OPEN.match(raw, m.start())
+        if skip:
+            key = (skip.group(1), skip.group(2).lower())
+            close = None if key in unclosed else _SKIP_CLOSE[key].search(raw, pos)
+            if close:
+                pos = close.end()
+            else:
+                unclosed.add(key)
+    return " ".join(parts)[:limit]
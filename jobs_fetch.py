@@ -1,13 +1,36 @@
+import codecs
+import hashlib
 import json
+import multiprocessing
+import os
 import re
+import sys
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import time
 from datetime import datetime
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
-TARGET_FILES = [
-    ("ats_targets_largecap.json", "ats_jobs_largecap_signals.json"),
-    ("ats_targets_midcap.json", "ats_jobs_midcap_signals.json"),
-]
+import endpoints
+import fetch_policy
+import html_text
+import metrics
+import poll_scheduler
+import signal_archive
+from keyword_matcher import KeywordMatcher
+
+# every ats_targets_<name>.json is a segment; its signals go to
+# ats_jobs_<name>_signals.jsonl.gz
+TARGET_GLOB = "ats_targets_*.json"
+
+# Per-board ETag/Last-Modified, payload hash and job versions from the last
+# run, so unchanged boards and postings are not re-normalised.
+STATE_FILE = "ats_fetch_state.json"
 
 AI_KEYWORDS = [
     "genai", "generative ai", "llm", "copilot", "prompt",
@@ -25,34 +48,262 @@ SKILL_PATTERNS = [
     r"\bproduct management\b", r"\bux\b", r"\bdesign\b"
 ]
 
+# ---- FETCH CONCURRENCY ----
+# Boards are fetched on a bounded thread pool over one pooled session; each
+# ATS host gets its own cap so we stay polite as the target lists grow.
+MAX_WORKERS = 16
+HOST_CONCURRENCY = {
+    "boards-api.greenhouse.io": 6,
+    "api.lever.co": 4,
+}
+DEFAULT_HOST_CONCURRENCY = 2
+
+# Payloads above this size (or without a Content-Length) are parsed one job at
+# a time instead of being loaded whole; Lever boards are fetched in pages.
+STREAM_THRESHOLD = 2 * 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+LEVER_PAGE_SIZE = 100
+
+# Normalisation and matching are pure-Python CPU work. With processes > 0 the
+# postings that need normalising are sent to a process pool in chunks; workers
+# are spawned, so each imports this module and builds JOB_MATCHER once.
+NORMALISE_PROCESSES = 0     # 0: normalise on the fetching thread
+NORMALISE_CHUNK = 200       # postings per worker task
+MAX_PENDING_CHUNKS = 8      # per board; the stream waits beyond this
+
 INDIA_LOC_HINTS = ["india", "bengaluru", "bangalore", "mumbai", "gurgaon", "gurugram", "noida", "hyderabad", "pune", "chennai", "kolkata", "ahmedabad"]
 
+# AI keywords and skill patterns share one compiled matcher, so each job blob
+# is scanned once; hits need word boundaries ("ai" no longer matches "email")
+AI_LABEL = "ai_related"
+SKILL_LABELS = {pat.strip("\\b"): pat for pat in SKILL_PATTERNS}
+JOB_MATCHER = KeywordMatcher({
+    AI_LABEL: [re.escape(k) for k in AI_KEYWORDS],
+    **{label: [pat] for label, pat in SKILL_LABELS.items()},
+})
+
+def match_job_text(text: str):
+    """(skill_hits, ai_related) from a single pass over text."""
+    hits = JOB_MATCHER.scan(text)
+    ai = AI_LABEL in hits
+    hits.discard(AI_LABEL)
+    return sorted(hits), ai
+
 def contains_ai(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in AI_KEYWORDS)
+    return match_job_text(text)[1]
 
 def extract_skill_hits(text: str):
-    t = (text or "").lower()
-    hits = []
-    for pat in SKILL_PATTERNS:
-        if re.search(pat, t):
-            hits.append(pat.strip("\\b"))
-    return sorted(set(hits))
+    return match_job_text(text)[0]
+
+_session = None
+_host_slots = {}
+_lock = threading.Lock()
 
-def safe_get(url, timeout=25):
-    return requests.get(url, timeout=timeout, headers={"User-Agent": "ai-trends-signal-engine/1.0"})
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            pool = max(HOST_CONCURRENCY.values(), default=DEFAULT_HOST_CONCURRENCY)
+            adapter = HTTPAdapter(pool_connections=len(HOST_CONCURRENCY) + 1, pool_maxsize=max(pool, MAX_WORKERS))
+            _session = requests.Session()
+            _session.headers["User-Agent"] = "ai-trends-signal-engine/1.0"
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def host_slot(url):
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _host_slots:
+            limit = HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY)
+            _host_slots[host] = threading.BoundedSemaphore(limit)
+        return _host_slots[host]
+
+def safe_get(url, timeout=25, headers=None, stream=False):
+    # retries, rate limits and the circuit breaker live in fetch_policy; each
+    # attempt takes the host slot only while its request is in flight, so a
+    # board backing off does not hold up the others on that host
+    slot = host_slot(url)
+    def attempt():
+        slot.acquire()
+        try:
+            r = get_session().get(endpoints.resolve(url), timeout=(fetch_policy.CONNECT_TIMEOUT, timeout),
+                                  headers=headers, stream=stream)
+        except Exception:
+            slot.release()
+            raise
+        if not stream:
+            slot.release()
+            return r
+
+        # a streamed body keeps its connection busy, so it keeps the host slot
+        # until the response is closed
+        close = r.close
+        released = []
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    slot.release()
+        r.close = close_and_release
+        return r
+    return fetch_policy.send(url, attempt)
+
+def iter_json_items(chunks, key=None):
+    """
+    Incrementally decode the items of a JSON array from byte chunks, either
+    the top-level array or the array under `key` in the top-level object.
+    Only the item being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf, pos = "", 0
+
+    def more():
+        nonlocal buf, pos
+        chunk = next(chunks, None)
+        tail = text.decode(chunk or b"", final=chunk is None)
+        buf, pos = buf[pos:] + tail, 0
+        return chunk is not None
+
+    opener = re.compile(r'"%s"\s*:\s*\[' % re.escape(key) if key else r"\s*\[")
+    while True:
+        m = opener.search(buf) if key else opener.match(buf)
+        if m:
+            pos = m.end()
+            break
+        if not more():
+            return
+
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf):
+                break
+            if not more():
+                raise ValueError("truncated JSON array")
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not more():
+                raise
+            continue
+        pos = end
+        yield item
 
-def fetch_greenhouse(board_url):
+def stream_items(r, key, new_state, url):
+    digest = hashlib.sha256()
+    size = 0
+    def chunks():
+        nonlocal size
+        for chunk in r.iter_content(STREAM_CHUNK):
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+    try:
+        yield from iter_json_items(chunks(), key)
+    finally:
+        r.close()
+        metrics.received(url, size)
+    new_state["content_hash"] = digest.hexdigest()
+
+def conditional_fetch(url, board_state, key=None):
+    """
+    GET with If-None-Match / If-Modified-Since from the previous run.
+    Returns (jobs, new_state); jobs is None when the board has not changed,
+    either because the server answered 304 or the payload hash matches.
+
+    Large or unsized payloads come back as a lazy iterator over jobs; their
+    content_hash is filled into new_state once the iterator is exhausted.
+    """
+    board_state = board_state or {}
+    headers = {}
+    if board_state.get("etag"):
+        headers["If-None-Match"] = board_state["etag"]
+    if board_state.get("last_modified"):
+        headers["If-Modified-Since"] = board_state["last_modified"]
+
+    r = safe_get(url, headers=headers, stream=True)
+    metrics.request(url, r.elapsed.total_seconds(), r.status_code)
+    if r.status_code == 304:
+        r.close()
+        return None, board_state
+    try:
+        r.raise_for_status()
+    except Exception:
+        r.close()
+        raise
+
+    new_state = dict(board_state)
+    new_state["etag"] = r.headers.get("ETag", "")
+    new_state["last_modified"] = r.headers.get("Last-Modified", "")
+
+    size = int(r.headers.get("Content-Length") or 0)
+    if not size or size > STREAM_THRESHOLD:
+        return stream_items(r, key, new_state, url), new_state
+
+    try:
+        body = r.content
+    finally:
+        r.close()
+    metrics.received(url, len(body))
+    new_state["content_hash"] = hashlib.sha256(body).hexdigest()
+    if new_state["content_hash"] == board_state.get("content_hash"):
+        return None, new_state
+    data = json.loads(body)
+    return (data.get(key, []) if key else data), new_state
+
+def fetch_greenhouse(board_url, board_state=None):
     token = board_url.rstrip("/").split("/")[-1]
     api = f"https://boards-api.greenhouse.io/v1/boards/{token}/jobs?content=true"
-    r = safe_get(api)
-    r.raise_for_status()
-    return r.json().get("jobs", [])
+    return conditional_fetch(api, board_state, key="jobs")
+
+def with_query(url, **params):
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({k: str(v) for k, v in params.items()})
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+def iter_lever_pages(api_url, new_state, page_size):
+    digest = hashlib.sha256()
+    skip = 0
+    while True:
+        jobs, page_state = conditional_fetch(with_query(api_url, skip=skip, limit=page_size), {})
+        count = 0
+        for job in jobs:
+            count += 1
+            yield job
+        digest.update(page_state.get("content_hash", "").encode("utf-8"))
+        if count < page_size:
+            break
+        skip += page_size
+    new_state["content_hash"] = digest.hexdigest()
 
-def fetch_lever(api_url):
-    r = safe_get(api_url)
-    r.raise_for_status()
-    return r.json()
+def fetch_lever(api_url, board_state=None, page_size=LEVER_PAGE_SIZE):
+    # skip/limit pages have no single ETag, so paged boards are kept
+    # incremental through the per-posting versions in fetch_board
+    if not page_size:
+        return conditional_fetch(api_url, board_state)
+    new_state = {}
+    return iter_lever_pages(api_url, new_state, page_size), new_state
+
+def job_link(job):
+    return job.get("absolute_url") or job.get("hostedUrl") or job.get("applyUrl") or ""
+
+def job_version(job):
+    updated = job.get("updated_at") or job.get("updatedAt")
+    if updated:
+        return str(updated)
+    # Lever's v0 postings only carry createdAt, which an edit in place leaves
+    # alone, so they are versioned by their content
+    body = json.dumps(job, sort_keys=True, ensure_ascii=False)
+    return "sha1:" + hashlib.sha1(body.encode("utf-8")).hexdigest()
 
 def india_flags(location: str):
     loc = (location or "").lower()
@@ -68,8 +319,7 @@ def normalise_job(company, segment, source, job):
     else:
         location = (job.get("categories", {}) or {}).get("location", "") or ""
 
-    url = job.get("absolute_url") or job.get("hostedUrl") or job.get("applyUrl") or ""
-    description = job.get("content") or job.get("descriptionPlain") or job.get("description") or ""
+    url = job_link(job)
     team = ""
     if isinstance(job.get("departments"), list) and job.get("departments"):
         team = job.get("departments")[0].get("name", "")
@@ -78,8 +328,16 @@ def normalise_job(company, segment, source, job):
 
     created_at = job.get("updated_at") or job.get("createdAt") or job.get("created_at") or ""
 
-    text_blob = f"{title}\n{team}\n{location}\n{description}"
+    # tags and attributes are dropped before matching, and only the first
+    # MAX_TEXT_CHARS of text are extracted at all; Lever's descriptionPlain
+    # is already text, where a "<" is just a "<"
+    if job.get("content") or not job.get("descriptionPlain"):
+        text = html_text.extract_text(job.get("content") or job.get("description") or "")
+    else:
+        text = html_text.plain_text(job["descriptionPlain"])
+    text_blob = f"{title}\n{team}\n{location}\n{text}"
     geo_primary, india_relevance = india_flags(location)
+    skill_hits, ai_related = match_job_text(text_blob)
 
     return {
         "captured_at": datetime.utcnow().isoformat(),
@@ -92,87 +350,272 @@ def normalise_job(company, segment, source, job):
         "industry": "",
         "role_or_skill_hint": "",
         "title": title,
-        "snippet": (re.sub(r"\s+", " ", description).strip()[:300] if description else ""),
+        "snippet": text[:html_text.SNIPPET_CHARS],
         "link": url,
         "evidence_weight": 5,
         "notes": f"{source}; location={location}; team={team}; created_at={created_at}",
-        "skill_hits": extract_skill_hits(text_blob),
-        "ai_related": contains_ai(text_blob)
+        "skill_hits": skill_hits,
+        "ai_related": ai_related
     }
 
-def process_targets(target_file: str, output_file: str):
+def error_signal(segment, company, source, url, e):
+    label = "Greenhouse" if source == "greenhouse" else "Lever"
+    return {
+        "captured_at": datetime.utcnow().isoformat(),
+        "segment": segment,
+        "source_channel": "ats_jobs",
+        "source_type": "error",
+        "geo_primary": "Global",
+        "india_relevance": "Low",
+        "org_name": company,
+        "industry": "",
+        "role_or_skill_hint": "",
+        "title": f"ERROR fetching {label} jobs",
+        "snippet": str(e)[:300],
+        "link": url,
+        "evidence_weight": 1,
+        "notes": f"{source} fetch error"
+    }
+
+def config_hash():
+    # cached results are only valid for the keyword/skill config (and text
+    # extraction and posting versions) that made them
+    config = f"{JOB_MATCHER.pattern}|text={html_text.MAX_TEXT_CHARS}/{html_text.MAX_RAW_CHARS}|versions=content"
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:16]
+
+def load_state(path=STATE_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("config") != config_hash():
+        return {}
+    return state
+
+def save_state(state, path=STATE_FILE):
+    state["config"] = config_hash()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+def load_previous(output_file):
+    """
+    Last run's job signals for a segment, grouped by (source, org_name);
+    None if the snapshot is missing or can't be read.
+    """
+    if not Path(output_file).exists():
+        return None
+    previous = {}
+    try:
+        for sig in signal_archive.read_snapshot(output_file):
+            if sig.get("source_type") != "job_posting":
+                continue
+            source = (sig.get("notes") or "").split(";", 1)[0]
+            previous.setdefault((source, sig.get("org_name", "")), []).append(sig)
+    except (OSError, EOFError, ValueError, zlib.error) as e:
+        print(f"Unreadable {output_file} ({e}), fetching its boards in full")
+        return None
+    return previous
+
+def carry_over(sig):
+    sig = dict(sig)
+    sig["captured_at"] = datetime.utcnow().isoformat()
+    return sig
+
+def normalise_chunk(company, segment, source, jobs):
+    """Worker task: (postings normalised, AI-related signals in posting order)."""
+    kept = []
+    for job in jobs:
+        sig = normalise_job(company, segment, source, job)
+        if sig["ai_related"]:
+            kept.append(sig)
+    return len(jobs), kept
+
+def make_process_pool(processes):
+    # spawn, not fork: the pool is used from fetch threads that may hold locks
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+def submit_chunk(procs, pending, company, segment, source, jobs):
+    while len(pending) >= MAX_PENDING_CHUNKS:
+        pending.popleft().result()
+    fut = procs.submit(normalise_chunk, company, segment, source, jobs)
+    pending.append(fut)
+    return fut
+
+def target_files(pattern=TARGET_GLOB):
+    prefix = pattern.split("*", 1)[0]
+    return [(p.name, signal_archive.snapshot_file(f"ats_jobs_{p.stem[len(prefix):]}"))
+            for p in sorted(Path(".").glob(pattern))]
+
+def load_targets(target_file):
     if not Path(target_file).exists():
+        return None
+    with open(target_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def board_list(targets):
+    boards = [("greenhouse", t["name"], t["board_url"]) for t in targets.get("greenhouse", [])]
+    boards += [("lever", t["name"], t["api_url"]) for t in targets.get("lever", [])]
+    return boards
+
+def fetch_board(segment, source, company, url, state, previous, procs=None):
+    boards = state.setdefault("boards", {})
+    board_state = boards.get(url, {})
+    poll = board_state.get("poll")
+    t0 = time.perf_counter()
+    prev_signals = previous.get((source, company), [])
+    fetch = fetch_greenhouse if source == "greenhouse" else fetch_lever
+    prev_versions = board_state.get("jobs", {})
+    prev_by_link = {sig.get("link"): sig for sig in prev_signals}
+    versions = {}
+    signals = []
+    seen = normalised = ai_related = 0
+    try:
+        with metrics.board(f"{source}:{company}"):
+            jobs, new_state = fetch(url, board_state)
+            if jobs is None:
+                new_state = dict(new_state, poll=poll_scheduler.record(
+                    poll, datetime.utcnow(), 0, 1, time.perf_counter() - t0))
+                boards[url] = new_state
+                signals = [carry_over(sig) for sig in prev_signals]
+                metrics.count("jobs_fetch", records_out=len(signals), carried_over=len(signals))
+                return signals
+
+            # jobs may be a lazy stream: each posting is normalised and dropped
+            # before the next is decoded. Only postings that are new or have a
+            # new version get normalised; an unchanged posting is either carried
+            # over or was not AI-related. With a process pool, postings are
+            # batched and each chunk's future holds its place in the output.
+            batch, pending = [], deque()
+            for job in jobs:
+                seen += 1
+                job_id = str(job.get("id") or job_link(job))
+                version = job_version(job)
+                versions[job_id] = version
+                if job_id in prev_versions and prev_versions[job_id] == version:
+                    link = job_link(job)
+                    if link in prev_by_link:
+                        signals.append(carry_over(prev_by_link[link]))
+                    continue
+                if procs is not None:
+                    batch.append(job)
+                    if len(batch) >= NORMALISE_CHUNK:
+                        signals.append(submit_chunk(procs, pending, company, segment, source, batch))
+                        batch = []
+                    continue
+                sig = normalise_job(company, segment, source, job)
+                normalised += 1
+                if sig["ai_related"]:
+                    ai_related += 1
+                    signals.append(sig)
+            if batch:
+                signals.append(submit_chunk(procs, pending, company, segment, source, batch))
+
+            resolved = []
+            for item in signals:
+                if isinstance(item, Future):
+                    n, kept = item.result()
+                    normalised += n
+                    ai_related += len(kept)
+                    resolved.extend(kept)
+                else:
+                    resolved.append(item)
+            signals = resolved
+    except Exception as e:
+        metrics.count("jobs_fetch", board_errors=1)
+        # this run's snapshot holds only the error row, so the board's
+        # ETag/hash/versions no longer match any carried-over signals: drop
+        # them (and last_polled, so the board is due again next run) and the
+        # next fetch re-normalises every posting
+        poll = {k: v for k, v in (poll or {}).items() if k != "last_polled"}
+        boards[url] = {"poll": poll} if poll else {}
+        return [error_signal(segment, company, source, url, e)]
+
+    metrics.count("jobs_fetch", records_in=seen, normalised=normalised, ai_related=ai_related,
+                  carried_over=len(signals) - ai_related, records_out=len(signals))
+    new_state["jobs"] = versions
+    requests_made = seen // LEVER_PAGE_SIZE + 1 if source == "lever" and LEVER_PAGE_SIZE else 1
+    new_state["poll"] = poll_scheduler.record(
+        poll, datetime.utcnow(), poll_scheduler.churn(prev_versions, versions) if prev_versions else None,
+        requests_made, time.perf_counter() - t0)
+    boards[url] = new_state
+    return signals
+
+def process_targets(target_file: str, output_file: str, max_workers=MAX_WORKERS, state=None, procs=None, due=None):
+    """
+    Fetch a segment's boards. due is the set of board URLs to poll this run
+    (None: all of them); the others carry their last signals forward.
+    """
+    targets = load_targets(target_file)
+    if targets is None:
         print(f"Missing {target_file}, skipping.")
         return
 
-    with open(target_file, "r", encoding="utf-8") as f:
-        targets = json.load(f)
-
     segment = targets.get("segment", "unknown")
+    state = {} if state is None else state
+    state.setdefault("boards", {})
+    boards = board_list(targets)
+    previous = load_previous(output_file) if state["boards"] else {}
+    if previous is None:
+        # the board versions and ETags say which postings are already in the
+        # snapshot; without it they would carry over nothing, so forget them
+        # (poll history stays) and fetch every board of the segment
+        for _, _, url in boards:
+            poll = state["boards"].get(url, {}).get("poll")
+            state["boards"][url] = {"poll": poll} if poll else {}
+        previous, due = {}, None
+
+    def run_board(board):
+        source, company, url = board
+        if due is not None and url not in due:
+            return [carry_over(sig) for sig in previous.get((source, company), [])]
+        return fetch_board(segment, source, company, url, state, previous, procs)
+
+    # map() yields in submission order, so the archive gets the boards in
+    # target-file order no matter which board answers first
     all_signals = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for signals in pool.map(run_board, boards):
+            all_signals.extend(signals)
 
-    for t in targets.get("greenhouse", []):
-        company = t["name"]
-        board_url = t["board_url"]
-        try:
-            jobs = fetch_greenhouse(board_url)
-            for job in jobs:
-                sig = normalise_job(company, segment, "greenhouse", job)
-                if sig["ai_related"]:
-                    all_signals.append(sig)
-        except Exception as e:
-            all_signals.append({
-                "captured_at": datetime.utcnow().isoformat(),
-                "segment": segment,
-                "source_channel": "ats_jobs",
-                "source_type": "error",
-                "geo_primary": "Global",
-                "india_relevance": "Low",
-                "org_name": company,
-                "industry": "",
-                "role_or_skill_hint": "",
-                "title": "ERROR fetching Greenhouse jobs",
-                "snippet": str(e)[:300],
-                "link": board_url,
-                "evidence_weight": 1,
-                "notes": "greenhouse fetch error"
-            })
-
-    for t in targets.get("lever", []):
-        company = t["name"]
-        api_url = t["api_url"]
-        try:
-            jobs = fetch_lever(api_url)
-            for job in jobs:
-                sig = normalise_job(company, segment, "lever", job)
-                if sig["ai_related"]:
-                    all_signals.append(sig)
-        except Exception as e:
-            all_signals.append({
-                "captured_at": datetime.utcnow().isoformat(),
-                "segment": segment,
-                "source_channel": "ats_jobs",
-                "source_type": "error",
-                "geo_primary": "Global",
-                "india_relevance": "Low",
-                "org_name": company,
-                "industry": "",
-                "role_or_skill_hint": "",
-                "title": "ERROR fetching Lever jobs",
-                "snippet": str(e)[:300],
-                "link": api_url,
-                "evidence_weight": 1,
-                "notes": "lever fetch error"
-            })
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_signals, f, indent=2)
+    signal_archive.write_snapshot(output_file, all_signals)
+    signal_archive.append_signals(f"ats_{segment}", all_signals)
 
     print(f"{segment}: saved {len(all_signals)} AI-related job signals -> {output_file}")
 
-def main():
-    for target_file, output_file in TARGET_FILES:
-        process_targets(target_file, output_file)
+def main(processes=None, budget=None):
+    state = load_state()
+    state.setdefault("boards", {})
+    files = target_files()
+    urls = [url for target_file, _ in files for _, _, url in board_list(load_targets(target_file) or {})]
+    due = poll_scheduler.plan(urls, state["boards"], budget=budget)
+    print(f"Polling {len(due)} of {len(urls)} boards this run")
+
+    processes = NORMALISE_PROCESSES if processes is None else processes
+    procs = make_process_pool(processes) if processes else None
+    try:
+        # segments write to separate files, so they can run side by side
+        with ThreadPoolExecutor(max_workers=max(1, len(files))) as pool:
+            for _ in pool.map(lambda tf: process_targets(*tf, state=state, procs=procs, due=due), files):
+                pass
+    finally:
+        if procs is not None:
+            procs.shutdown()
+    save_state(state)
+
+def processes_from_argv(argv=None):
+    """--processes N (or auto = one per core) from the command line, else None."""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--processes" not in argv:
+        return None
+    i = argv.index("--processes")
+    if i + 1 >= len(argv):
+        raise SystemExit("--processes needs a number or 'auto'")
+    value = argv[i + 1]
+    return (os.cpu_count() or 1) if value == "auto" else int(value)
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("jobs_fetch"):
+            main(processes_from_argv())
+    finally:
+        metrics.write()
@@ -0,0 +1,68 @@
+import re
+
+class KeywordMatcher:
+    """
+    One compiled alternation over every keyword/pattern of every label, so a
+    text is scanned once no matter how many labels there are.
+
+    patterns: {label: [regex fragment, ...]}. Plain keywords should be passed
+    through re.escape (see from_keywords). With whole_word=True a hit needs a
+    word boundary on both sides ("ai" does not match "email"); with
+    whole_word=False only a leading boundary, so stems still catch
+    inflections ("agent" matches "agentic").
+    """
+
+    def __init__(self, patterns, whole_word=True):
+        self.labels = list(patterns)
+        self.whole_word = whole_word
+        self._compiled = []
+        fragments = []
+        tail = r"\b" if whole_word else ""
+        for label, frags in patterns.items():
+            for frag in frags:
+                fragments.append(frag)
+                self._compiled.append((label, re.compile(f"(?:{frag}){tail}")))
+
+        # longest first so "responsible ai" wins over "ai" at the same offset;
+        # the lookahead lets overlapping hits at later offsets still be found
+        alternation = "|".join(f"(?:{f})" for f in sorted(set(fragments), key=len, reverse=True))
+        self._regex = re.compile(rf"(?=(\b(?:{alternation}){tail}))") if fragments else None
+        self._term_labels = {}
+
+    @classmethod
+    def from_keywords(cls, keywords_by_label, whole_word=True):
+        return cls(
+            {label: [re.escape(k.lower()) for k in kws] for label, kws in keywords_by_label.items()},
+            whole_word=whole_word,
+        )
+
+    @property
+    def pattern(self):
+        return self._regex.pattern if self._regex else ""
+
+    def _labels_for(self, term):
+        # distinct matched terms are a small vocabulary, so this is cached.
+        # A term is the longest hit at its offset; a shorter keyword that is
+        # a prefix of it (ending on a word boundary) is a hit as well
+        labels = self._term_labels.get(term)
+        if labels is None:
+            labels = frozenset(label for label, rx in self._compiled if rx.match(term))
+            self._term_labels[term] = labels
+        return labels
+
+    def scan(self, text):
+        """Set of labels with at least one hit in text (case-insensitive)."""
+        found = set()
+        if not text or self._regex is None:
+            return found
+        for m in self._regex.finditer(text.lower()):
+            found |= self._labels_for(m.group(1))
+        return found
+
+def theme_matcher(theme_registry):
+    # leading word boundary only: "agent" still counts "agentic", but
+    # "risk" no longer matches inside "asterisk"
+    return KeywordMatcher.from_keywords(
+        {theme: cfg["keywords"] for theme, cfg in theme_registry.items()},
+        whole_word=False,
+    )
@@ -1,14 +1,25 @@
 from datetime import datetime
 from pathlib import Path
 
-TODAY = datetime.utcnow().date()
+import metrics
+import reports
+from time_index import as_of_from_argv
 
 TEMPLATE_FILE = "LINKEDIN_DRAFTS_TEMPLATE.md"
 OUTPUT_FILE = "linkedin_drafts.md"
 
-# Inputs we already generate
+# Inputs we already generate; their JSON artifacts are read first, the
+# markdown only when a report was written before artifacts existed
 CXO_FILE = "weekly_cxo_synthesis.md"
 CONTRA_FILE = "contrarian_insights.md"
+CONTRA_HEADING = "## 1) The “false obvious” narrative"
+# the first contrarian narrative's fields, labelled as in CONTRARIAN_TEMPLATE.md
+CONTRA_LABELS = (
+    ("said", "What people are saying"),
+    ("signals", "What’s actually happening (signals)"),
+    ("india", "Why this matters (India)"),
+    ("move", "Safer move for leaders"),
+)
 
 def safe_read(path):
     p = Path(path)
@@ -32,17 +43,38 @@ def extract_section(text, heading):
     chunk = rest[:next_idx] if next_idx != -1 else rest
     return chunk.strip()
 
-def main():
-    template = Path(TEMPLATE_FILE).read_text(encoding="utf-8")
-    cxo = safe_read(CXO_FILE)
+def cxo_sections_from_markdown(cxo):
+    return {
+        "segment_divergence": extract_section(cxo, "## 3. Largecap vs Midcap: how strategies are diverging"),
+        "whitespace_opportunities": extract_section(cxo, "## 6. Emerging whitespace opportunities to consider"),
+        "planning_implications": extract_section(cxo, "## 8. How this feeds next-quarter planning"),
+    }
+
+def load_cxo_sections():
+    artifact = reports.read_artifact(CXO_FILE)
+    if artifact:
+        return artifact["sections"]
+    return cxo_sections_from_markdown(safe_read(CXO_FILE))
+
+def contrarian_lead(contra_sections):
+    return "\n".join(f"**{label}:** {contra_sections.get(f'narrative_1_{key}', '')}" for key, label in CONTRA_LABELS)
+
+def load_contrarian_lead():
+    artifact = reports.read_artifact(CONTRA_FILE)
+    if artifact:
+        return contrarian_lead(artifact["sections"])
     contra = safe_read(CONTRA_FILE)
+    return extract_section(contra, CONTRA_HEADING) or contra[:800]
 
+def build_sections(cxo_sections, contra_1):
+    """
+    cxo_sections: weekly_cxo_synthesis sections (from build_sections() or its
+    artifact); contra_1: the first contrarian narrative (see contrarian_lead).
+    """
     # Pull useful raw material
-    divergence = extract_section(cxo, "## 3. Largecap vs Midcap: how strategies are diverging")
-    whitespace = extract_section(cxo, "## 6. Emerging whitespace opportunities to consider")
-    planning = extract_section(cxo, "## 8. How this feeds next-quarter planning")
-    # Contrarian items are already concise; just take first section-ish
-    contra_1 = extract_section(contra, "## 1) The “false obvious” narrative") or contra[:800]
+    divergence = cxo_sections.get("segment_divergence", "")
+    whitespace = cxo_sections.get("whitespace_opportunities", "")
+    planning = cxo_sections.get("planning_implications", "")
 
     # Draft 1 (CXO)
     cxo_hook = "Most AI strategies are still tool strategies. That’s the wrong unit of change."
@@ -94,22 +126,31 @@ def main():
 
     contra_close = "If you run enablement: do you measure adoption, or decision quality — and why?"
 
-    out = (
-        template
-        .replace("{{week_ending}}", TODAY.isoformat())
-        .replace("{{cxo_hook}}", cxo_hook)
-        .replace("{{cxo_body}}", cxo_body)
-        .replace("{{cxo_close}}", cxo_close)
-        .replace("{{design_hook}}", design_hook)
-        .replace("{{design_body}}", design_body)
-        .replace("{{design_close}}", design_close)
-        .replace("{{contra_hook}}", contra_hook)
-        .replace("{{contra_body}}", contra_body)
-        .replace("{{contra_close}}", contra_close)
-    )
-
-    Path(OUTPUT_FILE).write_text(out, encoding="utf-8")
+    return {
+        "cxo_hook": cxo_hook,
+        "cxo_body": cxo_body,
+        "cxo_close": cxo_close,
+        "design_hook": design_hook,
+        "design_body": design_body,
+        "design_close": design_close,
+        "contra_hook": contra_hook,
+        "contra_body": contra_body,
+        "contra_close": contra_close,
+    }
+
+def publish(sections, as_of):
+    """Write the drafts and their JSON artifact; returns the markdown."""
+    return reports.publish(OUTPUT_FILE, TEMPLATE_FILE, "linkedin_drafts", as_of, sections,
+                           {"drafts": 3}, week_ending=as_of.isoformat())
+
+def main(as_of=None):
+    as_of = as_of or datetime.utcnow().date()
+    publish(build_sections(load_cxo_sections(), load_contrarian_lead()), as_of)
     print("LinkedIn drafts generated")
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("linkedin_drafts"):
+            main(as_of_from_argv())
+    finally:
+        metrics.write()
@@ -0,0 +1,237 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+try:
+    import resource
+except ImportError:   # not available on Windows; peak RSS is then omitted
+    resource = None
+
+# In-process run metrics: wall time and record counts per stage, HTTP latency
+# histograms and bytes per host, and wall time / bytes per board or feed.
+# write() dumps them as metrics.json and as a Prometheus textfile for the
+# node exporter's textfile collector.
+
+METRICS_FILE = "metrics.json"
+PROM_FILE = "metrics.prom"
+PREFIX = "signal_engine"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+
+# derived filter ratios: name -> (numerator count, denominator count)
+RATIOS = {
+    "ai_related_rate": ("ai_related", "normalised"),
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_stages = {}
+_hosts = {}
+_boards = {}
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _hosts.clear()
+        _boards.clear()
+
+def _stage(name):
+    return _stages.setdefault(name, {"status": "", "wall_s": 0.0, "counts": {}})
+
+def _host(host):
+    return _hosts.setdefault(host, {
+        "requests": 0, "bytes": 0, "status": {}, "events": {},
+        "latency_sum_s": 0.0, "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+    })
+
+def _board(label):
+    return _boards.setdefault(label, {"wall_s": 0.0, "requests": 0, "bytes": 0, "status": ""})
+
+# ---- RECORDING ----
+
+@contextmanager
+def stage(name):
+    """Time a stage; its status is "failed" if the block raises."""
+    t0 = time.perf_counter()
+    status = "ran"
+    try:
+        yield
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        with _lock:
+            rec = _stage(name)
+            rec["wall_s"] += time.perf_counter() - t0
+            rec["status"] = status
+
+def mark(name, status):
+    """Record a stage that did not run ("skipped", "blocked")."""
+    with _lock:
+        _stage(name)["status"] = status
+
+def count(stage_name, **counts):
+    """Add to a stage's counters, e.g. count("jobs_fetch", records_in=40)."""
+    with _lock:
+        rec = _stage(stage_name)["counts"]
+        for key, value in counts.items():
+            rec[key] = rec.get(key, 0) + value
+
+@contextmanager
+def board(label):
+    """Time one board/feed; requests made on this thread are attributed to it."""
+    t0 = time.perf_counter()
+    _local.board = label
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _local.board = None
+        with _lock:
+            rec = _board(label)
+            rec["wall_s"] += time.perf_counter() - t0
+            rec["status"] = status
+
+def request(url, seconds, status):
+    """One HTTP round trip; seconds is time to response headers."""
+    host = urlparse(url).netloc
+    label = getattr(_local, "board", None)
+    with _lock:
+        rec = _host(host)
+        rec["requests"] += 1
+        rec["latency_sum_s"] += seconds
+        key = str(status)
+        rec["status"][key] = rec["status"].get(key, 0) + 1
+        i = 0
+        while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+            i += 1
+        rec["latency_buckets"][i] += 1
+        if label:
+            _board(label)["requests"] += 1
+
+def received(url, nbytes):
+    host = urlparse(url).netloc
+    label = getattr(_local, "board", None)
+    with _lock:
+        _host(host)["bytes"] += nbytes
+        if label:
+            _board(label)["bytes"] += nbytes
+
+def host_event(url, event):
+    """A fetch-policy event for the url's host (a retry, a circuit-open fast fail)."""
+    host = urlparse(url).netloc
+    with _lock:
+        events = _host(host)["events"]
+        events[event] = events.get(event, 0) + 1
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+# ---- OUTPUT ----
+
+def snapshot():
+    with _lock:
+        stages = json.loads(json.dumps(_stages))
+        hosts = json.loads(json.dumps(_hosts))
+        boards = json.loads(json.dumps(_boards))
+    for rec in stages.values():
+        counts = rec["counts"]
+        for name, (num, den) in RATIOS.items():
+            if counts.get(den):
+                rec.setdefault("ratios", {})[name] = counts.get(num, 0) / counts[den]
+    for rec in hosts.values():
+        rec["latency_bucket_bounds_s"] = list(LATENCY_BUCKETS) + ["+Inf"]
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": stages,
+        "hosts": hosts,
+        "boards": boards,
+    }
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def prometheus_text(snap):
+    out = []
+    def family(name, kind, help_text):
+        out.append(f"# HELP {PREFIX}_{name} {help_text}")
+        out.append(f"# TYPE {PREFIX}_{name} {kind}")
+    def sample(name, labels, value):
+        body = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+        out.append(f"{PREFIX}_{name}{{{body}}} {value}" if body else f"{PREFIX}_{name} {value}")
+
+    family("stage_duration_seconds", "gauge", "Wall time per pipeline stage in the last run.")
+    for name, rec in snap["stages"].items():
+        sample("stage_duration_seconds", {"stage": name, "status": rec["status"]}, round(rec["wall_s"], 6))
+    family("stage_records", "gauge", "Per-stage record counts in the last run.")
+    for name, rec in snap["stages"].items():
+        for kind, value in rec["counts"].items():
+            sample("stage_records", {"stage": name, "kind": kind}, value)
+    family("stage_filter_ratio", "gauge", "Share of records kept by a stage filter.")
+    for name, rec in snap["stages"].items():
+        for ratio, value in rec.get("ratios", {}).items():
+            sample("stage_filter_ratio", {"stage": name, "filter": ratio}, round(value, 6))
+
+    family("http_request_duration_seconds", "histogram", "Time to response headers per host.")
+    for host, rec in snap["hosts"].items():
+        running = 0
+        for bound, n in zip(LATENCY_BUCKETS, rec["latency_buckets"]):
+            running += n
+            sample("http_request_duration_seconds_bucket", {"host": host, "le": bound}, running)
+        sample("http_request_duration_seconds_bucket", {"host": host, "le": "+Inf"}, rec["requests"])
+        sample("http_request_duration_seconds_sum", {"host": host}, round(rec["latency_sum_s"], 6))
+        sample("http_request_duration_seconds_count", {"host": host}, rec["requests"])
+    family("http_responses", "gauge", "Responses per host and status code.")
+    for host, rec in snap["hosts"].items():
+        for status, n in rec["status"].items():
+            sample("http_responses", {"host": host, "code": status}, n)
+    family("http_policy_events", "gauge", "Retries and circuit-open fast fails per host.")
+    for host, rec in snap["hosts"].items():
+        for event, n in rec["events"].items():
+            sample("http_policy_events", {"host": host, "event": event}, n)
+    family("http_response_bytes", "gauge", "Response body bytes read per host.")
+    for host, rec in snap["hosts"].items():
+        sample("http_response_bytes", {"host": host}, rec["bytes"])
+
+    family("board_duration_seconds", "gauge", "Wall time per board or feed.")
+    for label, rec in snap["boards"].items():
+        sample("board_duration_seconds", {"board": label, "status": rec["status"]}, round(rec["wall_s"], 6))
+    family("board_response_bytes", "gauge", "Response body bytes read per board or feed.")
+    for label, rec in snap["boards"].items():
+        sample("board_response_bytes", {"board": label}, rec["bytes"])
+
+    if snap["peak_rss_bytes"] is not None:
+        family("peak_rss_bytes", "gauge", "Peak resident set size of the run.")
+        sample("peak_rss_bytes", {}, snap["peak_rss_bytes"])
+    family("last_run_timestamp_seconds", "gauge", "When these metrics were written.")
+    sample("last_run_timestamp_seconds", {}, round(time.time(), 3))
+    return "\n".join(out) + "\n"
+
+def _atomic_write(path, text):
+    # the textfile collector may read at any moment, so never expose a
+    # half-written file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+def write(json_path=METRICS_FILE, prom_path=PROM_FILE):
+    snap = snapshot()
+    _atomic_write(json_path, json.dumps(snap, indent=2, sort_keys=True) + "\n")
+    if prom_path:
+        _atomic_write(prom_path, prometheus_text(snap))
+    return snap
@@ -0,0 +1,125 @@
+import hashlib
+import re
+import struct
+from array import array
+from functools import lru_cache
+from operator import eq
+
+import signal_archive
+
+# Near-duplicate clustering: syndicated stories and the same role posted for
+# several cities get one cluster_id, so aggregations can count stories and
+# roles rather than copies.
+#
+# Each signal gets a MinHash signature in two halves: one over the title's
+# words and one over 3-word shingles of the snippet. Both halves have to agree, so a
+# shared boilerplate intro (same company, different roles) or a shared job
+# title (different companies) is not a duplicate on its own. Signatures are split
+# into LSH bands and only a cluster's first member is banded, so a signal is
+# compared with the heads of clusters it shares a band with: assignment is
+# linear in the number of signals and clusters cannot drift by chaining.
+
+TITLE_PERM = 64
+BODY_PERM = 64
+NUM_PERM = TITLE_PERM + BODY_PERM
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+SHINGLE = 3
+TITLE_SIMILARITY = 0.6  # estimated Jaccard each half needs to merge; titles
+BODY_SIMILARITY = 0.6   # are short, so city/country suffixes weigh heavily
+MAX_CANDIDATES = 64     # cluster heads compared per signal, at most
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_EMPTY = 0xFFFFFFFF
+
+@lru_cache(maxsize=1 << 16)
+def _hashes(token, perms):
+    # perms independent 32-bit hashes of one shingle in a single call
+    return struct.unpack(f"<{perms}I", hashlib.shake_128(token.encode("utf-8")).digest(4 * perms))
+
+def _minhash(tokens, perms):
+    if not tokens:
+        return [_EMPTY] * perms
+    return list(map(min, zip(*(_hashes(t, perms) for t in tokens))))
+
+def shingles(text, k=SHINGLE):
+    words = _TOKEN.findall((text or "").lower())
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+def signature(sig):
+    title = set(_TOKEN.findall((sig.get("title") or "").lower()))
+    return array("I", _minhash(title, TITLE_PERM) + _minhash(shingles(sig.get("snippet")), BODY_PERM))
+
+def clusterable(sig):
+    # fetch errors share a title and a boilerplate message across companies;
+    # each stays a cluster of its own
+    return sig.get("source_type") != "error"
+
+def band_keys(minhash):
+    """One signed 64-bit key per band (SQLite INTEGER friendly)."""
+    keys = []
+    for b in range(BANDS):
+        raw = struct.pack(f"<H{ROWS}I", b, *minhash[b * ROWS:(b + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+def similarity(a, b):
+    """Estimated Jaccard of the title halves and of the snippet halves."""
+    title = sum(map(eq, a[:TITLE_PERM], b[:TITLE_PERM])) / TITLE_PERM
+    body = sum(map(eq, a[TITLE_PERM:], b[TITLE_PERM:])) / BODY_PERM
+    return title, body
+
+def best_cluster(minhash, candidates):
+    """cluster_id of the most similar candidate (item_id, cluster_id, minhash), if similar enough."""
+    best, best_sim = None, -1.0
+    for _, cluster_id, other in candidates:
+        title, body = similarity(minhash, other)
+        if title >= TITLE_SIMILARITY and body >= BODY_SIMILARITY and title + body > best_sim:
+            best, best_sim = cluster_id, title + body
+    return best
+
+class ClusterIndex:
+    """In-memory LSH index over cluster heads; the first member names a cluster."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.heads = {}
+
+    def assign(self, item_id, minhash):
+        keys = band_keys(minhash)
+        seen, candidates = set(), []
+        for key in keys:
+            for head in self.buckets.get(key, ()):
+                if head not in seen and len(candidates) < MAX_CANDIDATES:
+                    seen.add(head)
+                    candidates.append((head, head, self.heads[head]))
+        cluster_id = best_cluster(minhash, candidates)
+        if cluster_id is None:
+            cluster_id = item_id
+            self.heads[item_id] = minhash
+            for key in keys:
+                self.buckets.setdefault(key, []).append(item_id)
+        return cluster_id
+
+def assign_clusters(signals):
+    """Set cluster_id on signals that lack one (in order); returns the number of clusters."""
+    index = ClusterIndex()
+    for s in signals:
+        if not s.get("cluster_id"):
+            item_id = s.get("signal_id") or signal_archive.signal_id(s)
+            s["cluster_id"] = index.assign(item_id, signature(s)) if clusterable(s) else item_id
+    return len({s["cluster_id"] for s in signals})
+
+def representatives(signals):
+    """The first signal of each cluster, in order; signals without a cluster_id count alone."""
+    seen = set()
+    out = []
+    for s in signals:
+        key = s.get("cluster_id") or s.get("signal_id") or id(s)
+        if key not in seen:
+            seen.add(key)
+            out.append(s)
+    return out
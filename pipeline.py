@@ -0,0 +1,229 @@
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+import contrarian_insights
+import daily_brief
+import jobs_fetch
+import linkedin_drafts
+import metrics
+import reports
+import rss_fetch
+import signals as signal_store
+import trend_analytics
+import trend_evolution
+import trend_store
+import validate_trends_registry
+import weekly_cxo_synthesis
+from time_index import TimeIndex, as_of_from_argv
+
+# Runs the whole engine in one process as a dependency graph. Signals are
+# loaded once and handed to the report stages in memory; a stage whose input
+# hash (its own inputs plus its upstream stages' hashes) matches the last
+# run is skipped. Every run leaves metrics.json / metrics.prom behind.
+
+STATE_FILE = "pipeline_state.json"
+LOOKBACK_DAYS = 8   # widest report window (weekly reports)
+WEEKLY_DAY = 4      # Friday: weekly stages join the daily run
+
+def _text(path):
+    p = Path(path)
+    return p.read_text(encoding="utf-8") if p.exists() else ""
+
+def _window_keys(index, days, as_of):
+    return [(s.get("signal_id"), s.get("captured_at")) for s in index.last_days(days, as_of)]
+
+# ---- STAGES ----
+# run(ctx) -> result kept in ctx[name]; inputs(ctx) -> anything JSON-able that
+# decides whether the stage can be skipped (no inputs: always runs).
+
+def run_signals(ctx):
+    as_of = ctx["as_of"]
+    start = as_of - timedelta(days=LOOKBACK_DAYS - 1)
+    index = TimeIndex(signal_store.signals_between(start, as_of))
+    metrics.count("signals", records_out=len(index), skipped_unparsable=index.skipped)
+    return index
+
+def run_validate(ctx):
+    if validate_trends_registry.main("TRENDS_REGISTRY.json") != 0:
+        raise RuntimeError("TRENDS_REGISTRY.json failed validation")
+
+def trend_inputs(ctx):
+    week = trend_store.week_key(ctx["as_of"])
+    days = (ctx["as_of"] - trend_store.week_start(week)).days + 1
+    return [week, _text(trend_evolution.THEME_FILE), _window_keys(ctx["signals"], days, ctx["as_of"])]
+
+def run_trends(ctx):
+    # the signals TimeIndex spans LOOKBACK_DAYS, which covers as_of's week
+    trend_evolution.main(as_of=ctx["as_of"], index=ctx["signals"])
+
+def brief_inputs(ctx):
+    as_of = ctx["as_of"]
+    return [as_of.isoformat(), _text(daily_brief.TEMPLATE_FILE), trend_analytics.history_key(as_of),
+            _window_keys(ctx["signals"], daily_brief.WINDOW_DAYS, as_of)]
+
+def run_brief(ctx):
+    as_of = ctx["as_of"]
+    sections, counts = daily_brief.build_sections(ctx["signals"].last_days(daily_brief.WINDOW_DAYS, as_of), as_of)
+    daily_brief.publish(sections, counts, as_of)
+    return sections
+
+def cxo_inputs(ctx):
+    as_of = ctx["as_of"]
+    return [as_of.isoformat(), _text(weekly_cxo_synthesis.TEMPLATE_FILE),
+            _window_keys(ctx["signals"], weekly_cxo_synthesis.WINDOW_DAYS, as_of)]
+
+def run_cxo(ctx):
+    as_of = ctx["as_of"]
+    sections, counts = weekly_cxo_synthesis.build_sections(
+        ctx["signals"].last_days(weekly_cxo_synthesis.WINDOW_DAYS, as_of))
+    weekly_cxo_synthesis.publish(sections, counts, as_of)
+    return sections
+
+def contrarian_inputs(ctx):
+    as_of = ctx["as_of"]
+    return [as_of.isoformat(), _text(contrarian_insights.TEMPLATE_FILE), contrarian_insights.latest_snapshot_week(as_of),
+            _window_keys(ctx["signals"], contrarian_insights.WINDOW_DAYS, as_of)]
+
+def run_contrarian(ctx):
+    as_of = ctx["as_of"]
+    signals = ctx["signals"].last_days(contrarian_insights.WINDOW_DAYS, as_of)
+    sections, counts = contrarian_insights.build_sections(signals, contrarian_insights.latest_snapshot_week(as_of))
+    contrarian_insights.publish(sections, counts, as_of)
+    return sections
+
+def linkedin_inputs(ctx):
+    return [ctx["as_of"].isoformat(), _text(linkedin_drafts.TEMPLATE_FILE)]
+
+def run_linkedin(ctx):
+    # upstream stages that were skipped left their artifacts on disk unchanged
+    cxo = ctx.get("weekly_cxo_synthesis")
+    if cxo is None:
+        cxo = linkedin_drafts.load_cxo_sections()
+    contra = ctx.get("contrarian_insights")
+    contra_1 = linkedin_drafts.load_contrarian_lead() if contra is None else linkedin_drafts.contrarian_lead(contra)
+    sections = linkedin_drafts.build_sections(cxo, contra_1)
+    linkedin_drafts.publish(sections, ctx["as_of"])
+    return sections
+
+def report_outputs(output_file):
+    return [output_file, str(reports.artifact_path(output_file))]
+
+STAGES = {
+    "jobs_fetch": {"deps": [], "run": lambda ctx: jobs_fetch.main(ctx.get("processes"))},
+    "rss_fetch": {"deps": [], "run": lambda ctx: rss_fetch.main()},
+    "signals": {"deps": ["jobs_fetch", "rss_fetch"], "run": run_signals},
+    "validate_trends_registry": {"deps": [], "run": run_validate},
+    "trend_evolution": {"deps": ["signals", "validate_trends_registry"], "run": run_trends,
+                        "inputs": trend_inputs, "outputs": [trend_store.HISTORY_DIR]},
+    "daily_brief": {"deps": ["signals"], "run": run_brief,
+                    "inputs": brief_inputs, "outputs": report_outputs(daily_brief.OUTPUT_FILE)},
+    "weekly_cxo_synthesis": {"deps": ["signals"], "run": run_cxo,
+                             "inputs": cxo_inputs, "outputs": report_outputs(weekly_cxo_synthesis.OUTPUT_FILE)},
+    "contrarian_insights": {"deps": ["signals", "trend_evolution"], "run": run_contrarian,
+                            "inputs": contrarian_inputs, "outputs": report_outputs(contrarian_insights.OUTPUT_FILE)},
+    "linkedin_drafts": {"deps": ["weekly_cxo_synthesis", "contrarian_insights"], "run": run_linkedin,
+                        "inputs": linkedin_inputs, "outputs": report_outputs(linkedin_drafts.OUTPUT_FILE)},
+}
+
+DAILY = ["jobs_fetch", "rss_fetch", "signals", "daily_brief"]
+WEEKLY = ["validate_trends_registry", "trend_evolution", "weekly_cxo_synthesis", "contrarian_insights", "linkedin_drafts"]
+
+# ---- RUNNER ----
+
+def stage_hash(name, ctx, hashes):
+    stage = STAGES[name]
+    if "inputs" not in stage:
+        return None
+    upstream = {dep: hashes.get(dep) for dep in stage["deps"]}
+    payload = json.dumps([name, stage["inputs"](ctx), upstream], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_state(path=STATE_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def run(selected, as_of=None, force=False, max_workers=4, state_file=STATE_FILE, prom_file=metrics.PROM_FILE,
+        processes=None):
+    """Run the selected stages (dependencies outside the selection are treated as done)."""
+    selected = [n for n in STAGES if n in set(selected)]
+    ctx = {"as_of": as_of or datetime.utcnow().date(), "processes": processes}
+    previous = load_state(state_file)
+    hashes, report, failed = {}, {}, set()
+
+    graph = TopologicalSorter({n: [d for d in STAGES[n]["deps"] if d in selected] for n in selected})
+    graph.prepare()
+
+    def execute(name):
+        stage = STAGES[name]
+        h = stage_hash(name, ctx, hashes)
+        outputs_exist = all(Path(p).exists() for p in stage.get("outputs", []))
+        if h is not None and not force and outputs_exist and previous.get(name) == h:
+            metrics.mark(name, "skipped")
+            return name, h, "skipped", 0.0
+        t0 = time.perf_counter()
+        with metrics.stage(name):
+            ctx[name] = stage["run"](ctx)
+        return name, h, "ran", time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        while graph.is_active():
+            for name in graph.get_ready():
+                if any(d in failed for d in STAGES[name]["deps"]):
+                    failed.add(name)
+                    report[name] = "blocked"
+                    metrics.mark(name, "blocked")
+                    graph.done(name)
+                    continue
+                pending[pool.submit(execute, name)] = name
+            if not pending:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = pending.pop(fut)
+                try:
+                    _, h, status, secs = fut.result()
+                    hashes[name] = h
+                    report[name] = status if status == "skipped" else f"ran in {secs:.1f}s"
+                except Exception as e:
+                    failed.add(name)
+                    report[name] = f"FAILED: {e}"
+                graph.done(name)
+
+    state = dict(previous)
+    state.update({n: h for n, h in hashes.items() if h is not None and n not in failed})
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    metrics.write(prom_path=prom_file)
+
+    for name in selected:
+        print(f"{name}: {report.get(name, 'not run')}")
+    return not failed
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    as_of = as_of_from_argv(argv)
+    if "all" in argv:
+        selected = DAILY + WEEKLY
+    elif "weekly" in argv:
+        selected = ["signals"] + WEEKLY
+    elif "daily" in argv:
+        selected = DAILY
+    else:
+        # default: the daily stages, plus the weekly ones on Fridays
+        selected = DAILY + (WEEKLY if as_of.weekday() == WEEKLY_DAY else [])
+    prom_file = argv[argv.index("--prom-file") + 1] if "--prom-file" in argv else metrics.PROM_FILE
+    ok = run(selected, as_of=as_of, force="--force" in argv, prom_file=prom_file,
+             processes=jobs_fetch.processes_from_argv(argv))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
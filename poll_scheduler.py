@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+# Adaptive polling for ATS boards. Each board keeps a small history in its
+# fetch state (boards[url]["poll"]): how many postings changed per hour
+# (new, re-versioned or closed; an EWMA over fetches) and what a fetch costs
+# in requests and seconds. A board is polled about once per TARGET_CHURN
+# expected changes, within [MIN_INTERVAL_H, MAX_INTERVAL_H], so a board that
+# posts daily is fetched every run and one that changes quarterly once a week.
+# The workflow runs once a day, so no interval is shorter than the gap between
+# runs: a busy board can't be polled more often than that.
+#
+# Each run, due boards are taken most-overdue first until the run's share of
+# DAILY_REQUEST_BUDGET is spent (a board that doesn't fit is passed over
+# for cheaper ones behind it); the rest wait for a later run, so a large
+# batch of new targets spreads itself over several runs. A board counts as due
+# if it will be by halfway to the next run: last_polled is stamped when its
+# fetch ends, so a board polled at 01:40 yesterday is a few minutes short of
+# 24h at today's 01:35 run and would otherwise wait a whole extra day.
+
+DAILY_REQUEST_BUDGET = 2000
+RUNS_PER_DAY = 1          # how often the workflow runs (see its cron)
+RUN_SLACK_H = 24 / RUNS_PER_DAY / 2
+
+MIN_INTERVAL_H = 24 / RUNS_PER_DAY
+MAX_INTERVAL_H = 24 * 7
+DEFAULT_INTERVAL_H = 24
+TARGET_CHURN = 2.0        # changed postings we aim to see per poll
+CHURN_ALPHA = 0.3         # EWMA weight of the newest observation
+
+def _hours(since, now):
+    return max((now - datetime.fromisoformat(since)).total_seconds() / 3600, 0.0)
+
+def _ewma(old, new):
+    return new if old is None else CHURN_ALPHA * new + (1 - CHURN_ALPHA) * old
+
+def interval_hours(rate_per_hour):
+    if rate_per_hour is None:
+        return DEFAULT_INTERVAL_H
+    if rate_per_hour <= 0:
+        return MAX_INTERVAL_H
+    return min(MAX_INTERVAL_H, max(MIN_INTERVAL_H, TARGET_CHURN / rate_per_hour))
+
+def churn(prev_versions, versions):
+    """Postings that are new, have a new version, or are gone since the last fetch."""
+    changed = sum(1 for job_id, v in versions.items() if prev_versions.get(job_id) != v)
+    closed = sum(1 for job_id in prev_versions if job_id not in versions)
+    return changed + closed
+
+def record(poll, now, changes, requests, seconds):
+    """
+    Fold one successful fetch into a board's poll history (returns a new
+    dict). changes is None for a first fetch, which sets no churn rate.
+    """
+    poll = dict(poll or {})
+    if changes is not None and poll.get("last_polled"):
+        hours = _hours(poll["last_polled"], now)
+        if hours > 0:
+            poll["rate"] = round(_ewma(poll.get("rate"), changes / hours), 6)
+    poll["requests"] = round(_ewma(poll.get("requests"), requests), 3)
+    poll["seconds"] = round(_ewma(poll.get("seconds"), seconds), 3)
+    poll["interval_h"] = round(interval_hours(poll.get("rate")), 2)
+    poll["last_polled"] = now.isoformat()
+    return poll
+
+def overdue(poll, now):
+    """Elapsed share of the board's interval; never-polled boards are infinitely overdue."""
+    if not poll or not poll.get("last_polled"):
+        return float("inf")
+    return _hours(poll["last_polled"], now) / poll.get("interval_h", DEFAULT_INTERVAL_H)
+
+def plan(urls, boards, now=None, budget=None):
+    """
+    The subset of urls to fetch this run. boards is the fetch state's
+    url -> board state map; budget is in requests (default: this run's
+    share of DAILY_REQUEST_BUDGET).
+    """
+    now = now or datetime.utcnow()
+    budget = DAILY_REQUEST_BUDGET / RUNS_PER_DAY if budget is None else budget
+    horizon = now + timedelta(hours=RUN_SLACK_H)
+    due = []
+    for url in dict.fromkeys(urls):
+        poll = boards.get(url, {}).get("poll")
+        ratio = overdue(poll, horizon)
+        if ratio >= 1:
+            due.append((-ratio, url, (poll or {}).get("requests") or 1))
+    due.sort()
+
+    selected, spent = set(), 0.0
+    for _, url, cost in due:
+        if spent + cost > budget and selected:
+            continue
+        selected.add(url)
+        spent += cost
+    return selected
@@ -0,0 +1,220 @@
+import json
+import re
+import sys
+import time
+from datetime import timedelta
+
+import signals as signal_store
+from signal_record import parse_notes
+from time_index import as_of_from_argv, day_start
+
+# Boolean and faceted queries over the signal index (signal_index.py):
+#
+#   python query.py 'segment:midcap skill:guardrails loc:bengaluru' --days 30 --facet org
+#   python query.py 'theme:"governance, risk & trust" (python OR sql) -type:error' --facet skill,org
+#
+# Terms are field:value (org, skill, theme, loc, segment, source, type, word;
+# company/location are aliases), a bare word is word:<word>, a quoted value
+# may contain spaces, and value* matches by prefix. Terms next to each other
+# are ANDed; OR, NOT (or a leading -) and parentheses work as usual. --days N
+# (ending on --as-of, default today) limits matches to signals last captured
+# in that window.
+
+FIELDS = {"org", "skill", "theme", "loc", "segment", "source", "type", "word"}
+ALIASES = {"company": "org", "location": "loc", "skills": "skill"}
+FACETS = ("org", "segment", "skill", "theme", "loc", "source", "type")
+SHOW = 10
+
+_TOKEN = re.compile(r'\(|\)|-?[\w.+#-]*:"[^"]*"\*?|-?"[^"]*"|[^\s()]+')
+
+# ---- PARSER ----
+
+def _term(token):
+    """("term", value, prefix) node(s) for one query token."""
+    field, sep, value = token.partition(":")
+    if not sep or field.lower() not in FIELDS | set(ALIASES):
+        field, value = "word", token
+    field = ALIASES.get(field.lower(), field.lower())
+    prefix = value.endswith("*")
+    value = value.rstrip("*").strip('"').lower()
+    if field == "word":
+        # a bare phrase is all of its words
+        parts = [("term", f"word:{w}", prefix) for w in re.findall(r"[a-z0-9][a-z0-9+#]*", value)]
+        return parts[0] if len(parts) == 1 else ("and", parts)
+    if field == "skill":
+        value = value.rstrip("?")
+    return ("term", f"{field}:{value}", prefix)
+
+def parse(text):
+    tokens = _TOKEN.findall(text)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def unary():
+        if peek() is None:
+            # "(", "a OR", "NOT": an operator with nothing after it
+            raise SystemExit("incomplete query")
+        if peek() in (")", "OR"):
+            raise SystemExit(f"unexpected {peek()!r} in query")
+        token = take()
+        if token == "NOT":
+            return ("not", unary())
+        if token.startswith("-") and len(token) > 1:
+            return ("not", _term(token[1:]))
+        if token == "(":
+            node = expr()
+            if peek() == ")":
+                take()
+            return node
+        return _term(token)
+
+    def conjunction():
+        nodes = [unary()]
+        while peek() not in (None, ")", "OR"):
+            nodes.append(unary())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def expr():
+        nodes = [conjunction()]
+        while peek() == "OR":
+            take()
+            nodes.append(conjunction())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    if not tokens:
+        return None
+    node = expr()
+    if pos < len(tokens):
+        raise SystemExit(f"unexpected {tokens[pos]!r} in query")
+    return node
+
+# ---- EVALUATION ----
+
+def _postings(conn, term, prefix):
+    if prefix:
+        rows = conn.execute("SELECT signal_id FROM index_terms WHERE term >= ? AND term < ?",
+                            (term, term + "￿"))
+    else:
+        rows = conn.execute("SELECT signal_id FROM index_terms WHERE term = ?", (term,))
+    return {r[0] for r in rows}
+
+def evaluate(conn, node, universe):
+    """signal_ids (within universe) matching a parsed query node."""
+    kind = node[0]
+    if kind == "term":
+        return _postings(conn, node[1], node[2]) & universe
+    if kind == "not":
+        return universe - evaluate(conn, node[1], universe)
+    if kind == "or":
+        out = set()
+        for child in node[1]:
+            out |= evaluate(conn, child, universe)
+        return out
+    # and: positive terms first, narrowing the universe as we go
+    result = universe
+    for child in sorted(node[1], key=lambda n: n[0] == "not"):
+        result = evaluate(conn, child, result)
+        if not result:
+            break
+    return result
+
+def window(conn, start=None, end=None):
+    """signal_ids last captured between start and end (dates, inclusive)."""
+    where, params = [], []
+    if start is not None:
+        where.append("captured_at >= ?")
+        params.append(day_start(start).isoformat())
+    if end is not None:
+        where.append("captured_at < ?")
+        params.append(day_start(end + timedelta(days=1)).isoformat())
+    sql = f"SELECT signal_id FROM index_docs {'WHERE ' + ' AND '.join(where) if where else ''}"
+    return {r[0] for r in conn.execute(sql, params)}
+
+def search(conn, text, start=None, end=None):
+    node = parse(text)
+    universe = window(conn, start, end)
+    return universe if node is None else evaluate(conn, node, universe)
+
+def _load_ids(conn, ids):
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_ids (signal_id TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM query_ids")
+    conn.executemany("INSERT INTO query_ids VALUES (?)", [(i,) for i in ids])
+
+def facets(conn, ids, names, limit=SHOW):
+    """{facet: [(value, signals)]} over the matched ids, most common first."""
+    _load_ids(conn, ids)
+    out = {}
+    for name in names:
+        if name == "org":
+            # original spelling of the org name, not the lower-cased term
+            rows = conn.execute("""
+                SELECT d.org_name, COUNT(*) FROM query_ids q JOIN index_docs d ON d.signal_id = q.signal_id
+                WHERE d.org_name IS NOT NULL AND d.org_name != ''
+                GROUP BY d.org_name ORDER BY 2 DESC, 1 LIMIT ?
+            """, (limit,))
+        else:
+            rows = conn.execute("""
+                SELECT substr(t.term, ?), COUNT(*) FROM query_ids q JOIN index_terms t ON t.signal_id = q.signal_id
+                WHERE t.term >= ? AND t.term < ?
+                GROUP BY t.term ORDER BY 2 DESC, 1 LIMIT ?
+            """, (len(name) + 2, f"{name}:", f"{name};", limit))
+        out[name] = rows.fetchall()
+    return out
+
+def latest(conn, ids, limit=SHOW):
+    """The most recently captured matches: (captured_at, org, title, location)."""
+    _load_ids(conn, ids)
+    rows = conn.execute("""
+        SELECT d.captured_at, s.record FROM query_ids q
+        JOIN index_docs d ON d.signal_id = q.signal_id
+        JOIN signals s ON s.signal_id = d.signal_id AND s.captured_at = d.captured_at
+        ORDER BY d.captured_at DESC LIMIT ?
+    """, (limit,))
+    out = []
+    for captured_at, record in rows:
+        sig = json.loads(record)
+        out.append((captured_at, sig.get("org_name", ""), sig.get("title", ""),
+                    parse_notes(sig.get("notes") or "")[1] or ""))
+    return out
+
+# ---- CLI ----
+
+def main(argv):
+    flags = {"--days", "--as-of", "--facet", "--limit"}
+    text = " ".join(a for i, a in enumerate(argv) if a not in flags and (i == 0 or argv[i - 1] not in flags))
+    days = int(argv[argv.index("--days") + 1]) if "--days" in argv else None
+    names = argv[argv.index("--facet") + 1].split(",") if "--facet" in argv else []
+    limit = int(argv[argv.index("--limit") + 1]) if "--limit" in argv else SHOW
+    unknown = [n for n in names if n not in FACETS]
+    if unknown:
+        raise SystemExit(f"unknown facet {', '.join(unknown)}; choose from {', '.join(FACETS)}")
+    as_of = as_of_from_argv(argv)
+    start = as_of - timedelta(days=days - 1) if days else None
+
+    conn = signal_store.connect()
+    try:
+        t0 = time.perf_counter()
+        ids = search(conn, text, start, as_of if days else None)
+        found = facets(conn, ids, names, limit)
+        rows = latest(conn, ids, limit)
+        ms = (time.perf_counter() - t0) * 1000
+    finally:
+        conn.close()
+
+    span = f" in the {days} days to {as_of}" if days else ""
+    print(f"{len(ids)} signals match{span} ({ms:.1f} ms)")
+    for name, values in found.items():
+        print(f"  {name}: " + (", ".join(f"{v} ({n})" for v, n in values) or "-"))
+    for captured_at, org, title, location in rows:
+        where = f" [{location}]" if location else ""
+        print(f"  {captured_at[:10]}  {org or '-'}: {title}{where}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+import json
+import re
+import threading
+from pathlib import Path
+
+# Shared plumbing for the report generators.
+#
+# Templates (*_TEMPLATE.md) are compiled once into their literal text and
+# {{slot}} names and filled in a single pass; a compiled template is reused
+# until the file changes, so rendering many reports in one run costs one
+# join each. Slots with no value are left as they are in the template.
+#
+# Next to its markdown every report writes a JSON artifact (daily_brief.md ->
+# daily_brief.json) holding the sections and counts it computed, so downstream
+# reports read section data instead of searching the rendered markdown.
+
+SLOT = re.compile(r"\{\{(\w+)\}\}")
+
+class Template:
+    def __init__(self, text):
+        pieces = SLOT.split(text)
+        self.literals = pieces[0::2]
+        self.slots = pieces[1::2]
+
+    def render(self, values):
+        out = [self.literals[0]]
+        for name, literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name)
+            out.append("{{%s}}" % name if value is None else str(value))
+            out.append(literal)
+        return "".join(out)
+
+_compiled = {}
+_lock = threading.Lock()
+
+def load_template(path):
+    p = Path(path)
+    mtime = p.stat().st_mtime_ns
+    with _lock:
+        cached = _compiled.get(str(p))
+        if cached and cached[0] == mtime:
+            return cached[1]
+    template = Template(p.read_text(encoding="utf-8"))
+    with _lock:
+        _compiled[str(p)] = (mtime, template)
+    return template
+
+def render(template_file, values):
+    return load_template(template_file).render(values)
+
+def artifact_path(output_file):
+    return Path(output_file).with_suffix(".json")
+
+def write_artifact(output_file, report, as_of, sections, counts=None):
+    payload = {
+        "report": report,
+        "as_of": as_of.isoformat(),
+        "counts": counts or {},
+        "sections": sections,
+    }
+    artifact_path(output_file).write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+def read_artifact(output_file):
+    """The artifact written for output_file, or None if there is none (or it is unreadable)."""
+    path = artifact_path(output_file)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+def publish(output_file, template_file, report, as_of, sections, counts=None, **extra):
+    """Render sections (plus extra slot values) into output_file and write its artifact; returns the markdown."""
+    out = render(template_file, {**sections, **extra})
+    Path(output_file).write_text(out, encoding="utf-8")
+    write_artifact(output_file, report, as_of, sections, counts)
+    return out
@@ -1,7 +1,16 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
 import feedparser
 import requests
-from datetime import datetime
-import json
+
+import endpoints
+import fetch_policy
+import metrics
+import signal_archive
 
 # ---- CONFIG ----
 
@@ -21,35 +30,157 @@ RSS_FEEDS = [
     ("BCG", "https://www.bcg.com/rss"),
 ]
 
-OUTPUT_FILE = "rss_signals.json"
+OUTPUT_FILE = signal_archive.snapshot_file("rss")
+STATE_FILE = "rss_fetch_state.json"   # per-feed ETag / Last-Modified
+
+ENTRIES_PER_FEED = 10   # limit per feed
+FEED_TIMEOUT = 20       # seconds, per feed, including the body download
+TIME_BUDGET = 60        # seconds for the whole run; late feeds are dropped
+MAX_WORKERS = 8
 
 # ---- FETCH ----
 
-signals = []
-
-for source_name, feed_url in RSS_FEEDS:
-    feed = feedparser.parse(feed_url)
-
-    for entry in feed.entries[:10]:  # limit per feed
-        signals.append({
-            "captured_at": datetime.utcnow().isoformat(),
-            "source_channel": "rss",
-            "source_type": "news",
-            "geo_primary": "India" if "Mint" in source_name or "Indian" in source_name or "ET" in source_name else "Global",
-            "india_relevance": "High" if "India" in source_name or "Mint" in source_name else "Medium",
-            "org_name": "",
-            "industry": "",
-            "role_or_skill_hint": "",
-            "title": entry.get("title", ""),
-            "snippet": entry.get("summary", "")[:300],
-            "link": entry.get("link", ""),
-            "evidence_weight": 3,
-            "notes": source_name
-        })
+def feed_signal(source_name, entry):
+    return {
+        "captured_at": datetime.utcnow().isoformat(),
+        "source_channel": "rss",
+        "source_type": "news",
+        "geo_primary": "India" if "Mint" in source_name or "Indian" in source_name or "ET" in source_name else "Global",
+        "india_relevance": "High" if "India" in source_name or "Mint" in source_name else "Medium",
+        "org_name": "",
+        "industry": "",
+        "role_or_skill_hint": "",
+        "title": entry.get("title", ""),
+        "snippet": entry.get("summary", "")[:300],
+        "link": entry.get("link", ""),
+        "evidence_weight": 3,
+        "notes": source_name
+    }
+
+def fetch_feed(session, feed_url, feed_state, timeout=FEED_TIMEOUT, name=None):
+    """
+    Conditional GET of one feed, bounded by timeout end to end.
+    Returns (entries, new_state); entries is None when the feed answered 304.
+    """
+    with metrics.board(f"rss:{name or feed_url}"):
+        return _fetch_feed(session, feed_url, feed_state, timeout)
+
+def _fetch_feed(session, feed_url, feed_state, timeout):
+    deadline = time.monotonic() + timeout
+    headers = {}
+    if feed_state.get("etag"):
+        headers["If-None-Match"] = feed_state["etag"]
+    if feed_state.get("last_modified"):
+        headers["If-Modified-Since"] = feed_state["last_modified"]
+
+    # retries stay inside the feed's own deadline
+    def attempt():
+        remaining = max(deadline - time.monotonic(), 0.1)
+        return session.get(endpoints.resolve(feed_url), headers=headers, stream=True,
+                           timeout=(min(fetch_policy.CONNECT_TIMEOUT, remaining), remaining))
+
+    with fetch_policy.send(feed_url, attempt, deadline=deadline) as r:
+        metrics.request(feed_url, r.elapsed.total_seconds(), r.status_code)
+        if r.status_code == 304:
+            return None, feed_state
+        r.raise_for_status()
+        body = bytearray()
+        try:
+            for chunk in r.iter_content(65536):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"feed exceeded {timeout}s")
+                body.extend(chunk)
+        finally:
+            metrics.received(feed_url, len(body))
+        new_state = {
+            "etag": r.headers.get("ETag", ""),
+            "last_modified": r.headers.get("Last-Modified", ""),
+        }
+
+    feed = feedparser.parse(bytes(body))
+    return feed.entries[:ENTRIES_PER_FEED], new_state
+
+def load_json(path, default):
+    if not Path(path).exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except Exception:
+            return default
+
+def fetch_feeds(feeds=RSS_FEEDS, state=None, previous=None, timeout=FEED_TIMEOUT, budget=TIME_BUDGET):
+    """
+    Fetch all feeds concurrently and return their signals in feed order.
+
+    state maps feed URL -> {"etag", "last_modified"} and is updated in place.
+    previous is the last run's signal list; a feed that answers 304 carries
+    its previous entries forward instead of being re-parsed. Feeds that fail
+    or are still running when the budget runs out contribute nothing and lose
+    their ETag/Last-Modified, as does a feed with no previous entries, so a
+    304 never carries forward an empty list.
+    """
+    state = {} if state is None else state
+    previous_by_feed = {}
+    for sig in previous or []:
+        previous_by_feed.setdefault(sig.get("notes", ""), []).append(sig)
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "ai-trends-signal-engine/1.0"
+
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    futures = [pool.submit(fetch_feed, session, url, state.get(url, {}) if previous_by_feed.get(name) else {},
+                           timeout, name) for name, url in feeds]
+    wait(futures, timeout=budget)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    signals = []
+    for (source_name, feed_url), fut in zip(feeds, futures):
+        if not fut.done():
+            print(f"{source_name}: over time budget, skipped")
+            metrics.count("rss_fetch", feeds_over_budget=1)
+            state.pop(feed_url, None)
+            continue
+        try:
+            entries, new_state = fut.result()
+        except Exception as e:
+            print(f"{source_name}: fetch failed ({e})")
+            metrics.count("rss_fetch", feeds_failed=1)
+            state.pop(feed_url, None)
+            continue
+        state[feed_url] = new_state
+        if entries is None:
+            now = datetime.utcnow().isoformat()
+            carried = previous_by_feed.get(source_name, [])
+            signals.extend(dict(sig, captured_at=now) for sig in carried)
+            metrics.count("rss_fetch", carried_over=len(carried))
+        else:
+            signals.extend(feed_signal(source_name, entry) for entry in entries)
+            metrics.count("rss_fetch", records_in=len(entries))
+    metrics.count("rss_fetch", records_out=len(signals))
+    return signals
 
 # ---- SAVE ----
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(signals, f, indent=2)
+def main():
+    state = load_json(STATE_FILE, {})
+    try:
+        previous = list(signal_archive.read_snapshot(OUTPUT_FILE))
+    except Exception:
+        previous = []
+
+    signals = fetch_feeds(state=state, previous=previous)
+
+    signal_archive.write_snapshot(OUTPUT_FILE, signals)
+    signal_archive.append_signals("rss", signals)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+    print(f"Saved {len(signals)} RSS signals")
 
-print(f"Saved {len(signals)} RSS signals")
+if __name__ == "__main__":
+    try:
+        with metrics.stage("rss_fetch"):
+            main()
+    finally:
+        metrics.write()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import signal_files
+from signal_record import SignalRecord
+
+# Append-only signal history:
+#   archive/<stream>/<YYYY-MM-DD>.jsonl.gz   one line per signal captured that day
+#   archive/<stream>/_index.jsonl.gz         signal_id -> first_seen / content hash, append-only
+# A partition line is either a full record (the signal is new, or its content
+# changed since its last full record) or a re-sighting,
+#   {"signal_id": ..., "last_seen": ...}
+# which says the last full record was captured again at last_seen. Old
+# partitions are never rewritten. Readers merge lines per signal_id, giving
+# the latest full record with captured_at/last_seen set to the latest sighting.
+# Files are gzip-compressed JSONL, appended a member at a time (signal_files).
+#
+# The fetchers' latest-run snapshots (<name>_signals.jsonl.gz) use the same
+# format, sorted by org_name then signal_id so a day's diff lines up record
+# by record.
+
+ARCHIVE_DIR = "archive"
+INDEX_FILE = "_index" + signal_files.SUFFIX
+
+# legacy snapshot files and the stream they backfill into
+LEGACY_FILES = [
+    ("rss_signals.json", "rss"),
+    ("ats_jobs_largecap_signals.json", "ats_largecap"),
+    ("ats_jobs_midcap_signals.json", "ats_midcap"),
+]
+
+def signal_id(sig):
+    # job links carry the ATS job id; RSS links identify the article
+    basis = sig.get("link") or sig.get("title") or ""
+    raw = f"{sig.get('source_channel', '')}|{sig.get('source_type', '')}|{basis}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+# fields that change on every capture and are not part of a signal's content
+VOLATILE = ("captured_at", "first_seen", "last_seen", "signal_id", "cluster_id")
+
+def content_hash(sig):
+    content = {k: v for k, v in sig.items() if k not in VOLATILE}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def is_sighting(line):
+    return "captured_at" not in line
+
+def merge(full, seen):
+    """A full record as re-sighted at seen."""
+    return dict(full, captured_at=seen, last_seen=seen)
+
+def snapshot_file(name):
+    """rss -> rss_signals.jsonl.gz"""
+    return f"{name}_signals{signal_files.SUFFIX}"
+
+def write_snapshot(path, signals):
+    signal_files.write(path, sorted(signals, key=lambda s: (s.get("org_name") or "", signal_id(s))))
+
+def read_snapshot(path):
+    """Records of a snapshot file, streamed; a legacy .json list also works."""
+    path = Path(path)
+    if path.suffix == ".json":
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                yield from json.load(f)
+        return
+    yield from signal_files.iter_records(path)
+
+def append_signals(stream, signals, root=ARCHIVE_DIR):
+    """Append signals to their capture-date partitions; returns lines written."""
+    base = Path(root) / stream
+    base.mkdir(parents=True, exist_ok=True)
+
+    first_seen, content = {}, {}
+    for r in signal_files.iter_records(base / INDEX_FILE):
+        first_seen.setdefault(r["signal_id"], r["first_seen"])
+        if "content" in r:
+            content[r["signal_id"]] = r["content"]
+    by_day = {}
+    for sig in signals:
+        captured = sig.get("captured_at", "")
+        if captured[:10]:
+            by_day.setdefault(captured[:10], []).append(sig)
+
+    new_index = []
+    written = 0
+    for day, day_signals in sorted(by_day.items()):
+        path = base / f"{day}{signal_files.SUFFIX}"
+        seen_today = {r["signal_id"] for r in signal_files.iter_records(path)}
+        fresh = []
+        for sig in day_signals:
+            sid = signal_id(sig)
+            if sid in seen_today:
+                continue
+            seen_today.add(sid)
+            captured = sig["captured_at"]
+            h = content_hash(sig)
+            if content.get(sid) == h:
+                fresh.append({"signal_id": sid, "last_seen": captured})
+                continue
+            first_seen.setdefault(sid, captured)
+            content[sid] = h
+            new_index.append({"signal_id": sid, "first_seen": first_seen[sid], "content": h})
+            fresh.append(dict(sig, signal_id=sid, first_seen=first_seen[sid], last_seen=captured))
+        signal_files.append(path, fresh)
+        written += len(fresh)
+
+    signal_files.append(base / INDEX_FILE, new_index)
+    return written
+
+def partitions(start=None, end=None, streams=None, root=ARCHIVE_DIR):
+    """Partition files whose date falls in [start, end], by name only."""
+    base = Path(root)
+    if not base.exists():
+        return []
+    start_s = start.isoformat() if start else ""
+    end_s = end.isoformat() if end else "9999-12-31"
+    out = []
+    for d in sorted(p for p in base.iterdir() if p.is_dir()):
+        if streams and d.name not in streams:
+            continue
+        for p in sorted(d.glob("*" + signal_files.SUFFIX)):
+            if p.name.startswith("_"):
+                continue
+            if start_s <= p.name[:-len(signal_files.SUFFIX)] <= end_s:
+                out.append(p)
+    return out
+
+def read_window(start=None, end=None, streams=None, root=ARCHIVE_DIR):
+    """
+    One SignalRecord per signal_id captured in [start, end] (dates,
+    inclusive): its latest full record, with captured_at and last_seen set
+    to the latest capture time.
+    """
+    latest = {}   # signal_id -> [last seen, full record or None]
+    for path in partitions(start, end, streams, root):
+        for r in signal_files.iter_records(path):
+            seen = r["last_seen"] if is_sighting(r) else r["captured_at"]
+            prev = latest.setdefault(r["signal_id"], [seen, None])
+            if seen >= prev[0]:
+                prev[0] = seen
+            if not is_sighting(r) and (prev[1] is None or r["captured_at"] >= prev[1]["captured_at"]):
+                prev[1] = r
+
+    # re-sightings whose full record predates the window: walk back until found
+    missing = {sid for sid, (_, full) in latest.items() if full is None}
+    if missing and start is not None:
+        for path in reversed(partitions(None, start - timedelta(days=1), streams, root)):
+            for r in signal_files.iter_records(path):
+                if r["signal_id"] in missing and not is_sighting(r):
+                    latest[r["signal_id"]][1] = r
+            missing = {sid for sid in missing if latest[sid][1] is None}
+            if not missing:
+                break
+
+    out = [merge(full, seen) for seen, full in latest.values() if full is not None]
+    return [SignalRecord.from_dict(r) for r in sorted(out, key=lambda r: r["captured_at"])]
+
+def backfill(root=ARCHIVE_DIR):
+    """One-off import of the legacy snapshot files into the archive."""
+    for path, stream in LEGACY_FILES:
+        if not Path(path).exists():
+            continue
+        n = append_signals(stream, list(read_snapshot(path)), root)
+        print(f"{path}: archived {n} signals -> {root}/{stream}")
+
+def migrate(root=ARCHIVE_DIR):
+    """
+    One-off conversion to the compressed format: archive .jsonl files are
+    gzipped line for line, legacy <name>_signals.json snapshots are rewritten
+    sorted as <name>_signals.jsonl.gz. The old files are removed once their
+    replacement reads back the same records.
+    """
+    base = Path(root)
+    for src in sorted(base.glob("*/*.jsonl")) if base.exists() else []:
+        dst = src.with_name(src.name + ".gz")
+        if dst.exists():
+            raise SystemExit(f"{dst} already exists; not overwriting")
+        signal_files.compress_file(src, dst)
+        with open(src, "r", encoding="utf-8") as f:
+            before = [json.loads(line) for line in f if line.strip()]
+        if before != list(signal_files.iter_records(dst)):
+            raise SystemExit(f"{dst} does not match {src}")
+        src.unlink()
+        print(f"{src} -> {dst}")
+    for src in sorted(Path(".").glob("*_signals.json")):
+        dst = Path(snapshot_file(src.name[:-len("_signals.json")]))
+        before = list(read_snapshot(src))
+        write_snapshot(dst, before)
+        key = lambda s: json.dumps(s, sort_keys=True)
+        if sorted(map(key, before)) != sorted(map(key, read_snapshot(dst))):
+            raise SystemExit(f"{dst} does not match {src}")
+        src.unlink()
+        print(f"{src} -> {dst}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        backfill()
+    elif len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate()
+    else:
+        print("usage: python signal_archive.py backfill|migrate")
@@ -0,0 +1,68 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+# On-disk format for the signal files that get committed (the snapshot files
+# and the archive partitions): newline-delimited JSON records, gzip-compressed.
+#   - Appends add a gzip member to the end of the file; a file is the
+#     concatenation of its members, which gzip -dc and gzip.open read as one
+#     stream. Bytes already written never change, so git stores a closed
+#     partition once, and a reader that remembers a file's size can resume
+#     from there (signals.sync does).
+#   - Members are written with mtime=0 and no file name, so the same records
+#     always compress to the same bytes (no spurious diffs).
+#   - Readers decompress line by line; a file is never loaded whole.
+# .gitattributes marks *.jsonl.gz with diff=gzip. With
+#   git config diff.gzip.textconv "gzip -dc"
+# git diff / git log -p show the records themselves.
+
+SUFFIX = ".jsonl.gz"
+COMPRESSLEVEL = 9
+
+def dumps(record):
+    return json.dumps(record, ensure_ascii=False)
+
+def member(lines):
+    """One gzip member holding lines (str, without newlines)."""
+    data = "".join(f"{line}\n" for line in lines).encode("utf-8")
+    return gzip.compress(data, compresslevel=COMPRESSLEVEL, mtime=0)
+
+def iter_lines(path, offset=0):
+    """Non-empty raw lines (bytes) of a file, starting at a member boundary."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        with gzip.GzipFile(fileobj=f, mode="rb") as z:
+            for line in z:
+                line = line.strip()
+                if line:
+                    yield line
+
+def iter_records(path, offset=0):
+    for line in iter_lines(path, offset):
+        yield json.loads(line)
+
+def append(path, records):
+    """Append records to a file as one new gzip member."""
+    if not records:
+        return
+    with open(path, "ab") as f:
+        f.write(member(dumps(r) for r in records))
+
+def write(path, records):
+    """Replace a file with records (one member), atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(member(dumps(r) for r in records))
+    os.replace(tmp, path)
+
+def compress_file(src, dst):
+    """Gzip a plain .jsonl file line for line (migration)."""
+    with open(src, "r", encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    tmp = Path(dst).with_name(Path(dst).name + ".tmp")
+    tmp.write_bytes(member(lines))
+    os.replace(tmp, dst)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import html_text
+from keyword_matcher import theme_matcher
+from signal_record import parse_notes
+
+# Inverted index over the signal store, kept in signals.db beside the signals
+# table and updated by signals.sync() from the rows each sync ingests (see
+# query.py for the query side). Every signal_id is indexed at its latest
+# capture under lower-case field:value terms:
+#   word:<token>     words of the title and snippet
+#   skill:<skill>    skill_hits ("guardrails?" is indexed as skill:guardrails)
+#   theme:<theme>    THEME_REGISTRY themes, matched as trend_evolution does
+#   org:<org name>   segment:<segment>   source:<channel>   type:<source_type>
+#   loc:<token>      words of a posting's location
+# index_docs holds each signal's latest capture time (for date windows) and a
+# hash of its terms, so a re-capture with unchanged content only moves the
+# time. A change to the themes or to INDEX_VERSION rebuilds the index once.
+
+INDEX_VERSION = 1
+THEME_FILE = "THEME_REGISTRY.json"
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "an and are as at be by for from in is it of on or our the this to we will with you your".split()
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_terms (
+    term      TEXT NOT NULL,
+    signal_id TEXT NOT NULL,
+    PRIMARY KEY (term, signal_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_index_terms_signal ON index_terms (signal_id);
+CREATE TABLE IF NOT EXISTS index_docs (
+    signal_id   TEXT PRIMARY KEY,
+    captured_at TEXT NOT NULL,   -- latest capture
+    org_name    TEXT,
+    content     TEXT NOT NULL    -- hash of the signal's terms
+);
+CREATE INDEX IF NOT EXISTS idx_index_docs_captured_at ON index_docs (captured_at);
+CREATE TABLE IF NOT EXISTS index_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_matchers = {}
+
+def load_themes(path=THEME_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def config_key(themes):
+    raw = json.dumps([INDEX_VERSION, themes], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def words(text):
+    return {t for t in TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS}
+
+def terms(sig, matcher=None):
+    """The index terms of one signal record (a dict as archived)."""
+    title = sig.get("title") or ""
+    snippet = sig.get("snippet") or ""
+    out = {f"word:{w}" for w in words(f"{title} {html_text.extract_text(snippet)}")}
+    out.update(f"skill:{s.rstrip('?')}" for s in sig.get("skill_hits", []))
+    if matcher is not None:
+        out.update(f"theme:{t.lower()}" for t in matcher.scan(f"{title} {snippet}"))
+    location = parse_notes(sig.get("notes") or "")[1]
+    if location:
+        out.update(f"loc:{w}" for w in words(location))
+    for field, key in (("org", "org_name"), ("segment", "segment"), ("source", "source_channel"),
+                       ("type", "source_type")):
+        if sig.get(key):
+            out.add(f"{field}:{sig[key].lower()}")
+    return out
+
+def update(conn, rows, matcher=None):
+    """
+    Index (signal_id, captured_at, record JSON) rows just ingested. Only a
+    signal's latest capture counts; older rows than what is indexed are
+    ignored. Runs in the caller's transaction.
+    """
+    latest = {}
+    for signal_id, captured_at, record in rows:
+        if signal_id not in latest or captured_at >= latest[signal_id][0]:
+            latest[signal_id] = (captured_at, record)
+    changed = 0
+    for signal_id, (captured_at, record) in latest.items():
+        have = conn.execute("SELECT captured_at, content FROM index_docs WHERE signal_id = ?",
+                            (signal_id,)).fetchone()
+        if have and have[0] >= captured_at:
+            continue
+        sig = json.loads(record)
+        found = terms(sig, matcher)
+        content = hashlib.sha1("\n".join(sorted(found)).encode("utf-8")).hexdigest()
+        if have and have[1] == content:
+            conn.execute("UPDATE index_docs SET captured_at = ? WHERE signal_id = ?", (captured_at, signal_id))
+            continue
+        conn.execute("DELETE FROM index_terms WHERE signal_id = ?", (signal_id,))
+        conn.executemany("INSERT INTO index_terms VALUES (?, ?)", [(t, signal_id) for t in found])
+        conn.execute("INSERT OR REPLACE INTO index_docs VALUES (?, ?, ?, ?)",
+                     (signal_id, captured_at, sig.get("org_name"), content))
+        changed += 1
+    return changed
+
+def ensure(conn, theme_file=THEME_FILE):
+    """
+    Create the index tables; if the themes (or INDEX_VERSION) changed since
+    the index was built, rebuild it from the signals table. Returns the theme
+    matcher for update().
+    """
+    conn.executescript(SCHEMA)
+    themes = load_themes(theme_file)
+    key = config_key(themes)
+    if key not in _matchers:
+        _matchers[key] = theme_matcher(themes) if themes else None
+    built = conn.execute("SELECT value FROM index_meta WHERE key = 'config'").fetchone()
+    if not built or built[0] != key:
+        with conn:
+            conn.execute("DELETE FROM index_terms")
+            conn.execute("DELETE FROM index_docs")
+            update(conn, conn.execute("SELECT signal_id, captured_at, record FROM signals").fetchall(),
+                   _matchers[key])
+            conn.execute("INSERT OR REPLACE INTO index_meta VALUES ('config', ?)", (key,))
+    return _matchers[key]
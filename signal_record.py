@@ -0,0 +1,233 @@
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache
+from operator import attrgetter
+
+# Compact in-memory form of a signal, used for everything loaded back from the
+# archive/store. The JSON records written by the fetchers stay as they are;
+# a SignalRecord is built from one at load time and keeps:
+#   - categorical fields (segment, source_channel, ...) as small integer codes
+#     into process-wide codebooks
+#   - skill_hits as a bitmask over a skill codebook
+#   - notes parsed once into source / location / team / created_at
+#   - title, snippet and link as UTF-8 bytes (a single "’" makes a str
+#     store every character in two bytes)
+#   - first_seen / last_seen sharing captured_at's string when equal
+# It answers the same read-only mapping calls as the dict (get, [], in,
+# keys, dict(rec)), so report code keeps using s.get("segment") etc.;
+# to_dict() gives back the original record.
+
+CATEGORICAL = ("segment", "source_channel", "source_type", "geo_primary", "india_relevance",
+               "industry", "role_or_skill_hint")
+TEXT = ("title", "snippet", "link")
+
+_lock = threading.Lock()
+
+class Codebook:
+    """Value <-> small integer code, grown on first sight (code 0 is None)."""
+
+    def __init__(self, values=(None,)):
+        self.values = []
+        self.codes = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value):
+        c = self.codes.get(value)
+        if c is None:
+            with _lock:
+                c = self.codes.get(value)
+                if c is None:
+                    c = self.codes[value] = len(self.values)
+                    self.values.append(value)
+        return c
+
+CODEBOOKS = {name: Codebook() for name in CATEGORICAL}
+SKILLS = Codebook(())   # bit i of a skill mask is SKILLS.values[i]
+
+def skill_mask(skills):
+    mask = 0
+    for skill in skills:
+        mask |= 1 << SKILLS.code(skill)
+    return mask
+
+@lru_cache(maxsize=4096)
+def _skill_names(mask):
+    names = []
+    i = 0
+    while mask:
+        if mask & 1:
+            names.append(SKILLS.values[i])
+        mask >>= 1
+        i += 1
+    return tuple(sorted(names))
+
+def skill_names(mask):
+    return list(_skill_names(mask))
+
+def parse_notes(notes):
+    """
+    (source, location, team, created_at) from a notes string. Job postings
+    pack "source; location=..; team=..; created_at=.."; anything else is
+    kept whole as the source, with the other fields None.
+    """
+    source, sep, rest = notes.partition("; location=")
+    if not sep:
+        return notes, None, None, None
+    location, _, rest = rest.partition("; team=")
+    team, _, created_at = rest.partition("; created_at=")
+    return source, location, team, created_at
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+class SignalRecord:
+    __slots__ = (
+        "signal_id", "cluster_id", "captured_at", "first_seen", "last_seen",
+        "segment_code", "source_channel_code", "source_type_code", "geo_primary_code",
+        "india_relevance_code", "industry_code", "role_or_skill_hint_code",
+        "org_name", "_title", "_snippet", "_link", "evidence_weight",
+        "source", "location", "team", "created_at",
+        "skills", "ai_related",
+    )
+
+    @classmethod
+    def from_dict(cls, d, cluster_id=None):
+        rec = cls()
+        rec.signal_id = d.get("signal_id")
+        rec.cluster_id = rec.signal_id if cluster_id == rec.signal_id else cluster_id
+        captured = d.get("captured_at", "")
+        rec.captured_at = captured
+        rec.first_seen = captured if d.get("first_seen") == captured else d.get("first_seen")
+        rec.last_seen = captured if d.get("last_seen") == captured else d.get("last_seen")
+        for name in CATEGORICAL:
+            setattr(rec, f"{name}_code", CODEBOOKS[name].code(d.get(name)))
+        rec.org_name = _intern(d.get("org_name"))
+        for name in TEXT:
+            value = d.get(name)
+            setattr(rec, f"_{name}", value.encode("utf-8") if value is not None else None)
+        rec.evidence_weight = d.get("evidence_weight")
+        if "notes" in d:
+            source, location, team, created_at = parse_notes(d["notes"])
+            rec.source = _intern(source)
+            rec.location = _intern(location)
+            rec.team = _intern(team)
+            rec.created_at = created_at
+        else:
+            rec.source = rec.location = rec.team = rec.created_at = None
+        rec.skills = skill_mask(d["skill_hits"]) if "skill_hits" in d else None
+        rec.ai_related = d.get("ai_related")
+        return rec
+
+    # typed accessors
+
+    @property
+    def segment(self):
+        return CODEBOOKS["segment"].values[self.segment_code]
+
+    @property
+    def source_channel(self):
+        return CODEBOOKS["source_channel"].values[self.source_channel_code]
+
+    @property
+    def source_type(self):
+        return CODEBOOKS["source_type"].values[self.source_type_code]
+
+    @property
+    def title(self):
+        return self._title.decode("utf-8") if self._title is not None else None
+
+    @property
+    def snippet(self):
+        return self._snippet.decode("utf-8") if self._snippet is not None else None
+
+    @property
+    def link(self):
+        return self._link.decode("utf-8") if self._link is not None else None
+
+    @property
+    def skill_hits(self):
+        return skill_names(self.skills) if self.skills is not None else None
+
+    @property
+    def notes(self):
+        if self.source is None:
+            return None
+        if self.location is None:
+            return self.source
+        return f"{self.source}; location={self.location}; team={self.team}; created_at={self.created_at}"
+
+    def has_skill(self, skill):
+        code = SKILLS.codes.get(skill)
+        return code is not None and bool(self.skills and self.skills >> code & 1)
+
+    # read-only mapping interface, matching the JSON record
+
+    def _value(self, key):
+        getter = _GETTERS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def get(self, key, default=None):
+        try:
+            value = self._value(key)
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self._value(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return [k for k in KEYS if self.get(k) is not None]
+
+    def to_dict(self):
+        return {k: self._value(k) for k in self.keys()}
+
+    def __repr__(self):
+        return f"SignalRecord({self.signal_id!r}, {self.captured_at!r}, {self.title!r})"
+
+def _categorical(name):
+    values = CODEBOOKS[name].values
+    code = attrgetter(f"{name}_code")
+    return lambda rec: values[code(rec)]
+
+_GETTERS = {name: _categorical(name) for name in CATEGORICAL}
+_GETTERS.update({name: attrgetter(name) for name in (
+    "signal_id", "cluster_id", "captured_at", "first_seen", "last_seen", "org_name",
+    "evidence_weight", "ai_related", "title", "snippet", "link", "notes", "skill_hits")})
+
+# key order of the fetchers' JSON records
+KEYS = ("captured_at", "segment", "source_channel", "source_type", "geo_primary", "india_relevance",
+        "org_name", "industry", "role_or_skill_hint", "title", "snippet", "link", "evidence_weight",
+        "notes", "skill_hits", "ai_related", "signal_id", "first_seen", "last_seen", "cluster_id")
+
+def skill_counts(signals):
+    """
+    Counter of skills over signals (records or plain dicts), counted on the
+    bitmasks; keys come in first-seen order (by signal, then name), as if the
+    skill_hits lists had been counted one by one.
+    """
+    counts = {}
+    first = {}
+    for r, s in enumerate(signals):
+        mask = s.skills if isinstance(s, SignalRecord) else skill_mask(s.get("skill_hits", []))
+        i = 0
+        while mask:
+            if mask & 1:
+                if i in counts:
+                    counts[i] += 1
+                else:
+                    counts[i] = 1
+                    first[i] = (r, SKILLS.values[i])
+            mask >>= 1
+            i += 1
+    return Counter({SKILLS.values[i]: counts[i] for i in sorted(counts, key=first.get)})
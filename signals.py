@@ -0,0 +1,194 @@
+import json
+import sqlite3
+from array import array
+from datetime import date, datetime, time, timedelta
+
+import near_dupes
+import signal_archive
+import signal_files
+import signal_index
+from signal_record import SignalRecord
+
+# Local SQLite index over the signal archive. The archive stays the source of
+# truth (and is what gets committed); signals.db is a disposable cache that is
+# brought up to date from the archive's appended bytes on every connect().
+# Each new signal_id is also given a near-duplicate cluster_id (near_dupes)
+# against an LSH band table kept alongside, and the inverted index used by
+# query.py (signal_index) is updated from the same rows.
+
+DB_FILE = "signals.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    signal_id      TEXT NOT NULL,
+    captured_at    TEXT NOT NULL,
+    segment        TEXT,
+    source_channel TEXT,
+    source_type    TEXT,
+    org_name       TEXT,
+    record         TEXT NOT NULL,
+    PRIMARY KEY (signal_id, captured_at)
+);
+CREATE INDEX IF NOT EXISTS idx_signals_captured_at ON signals (captured_at);
+CREATE INDEX IF NOT EXISTS idx_signals_segment ON signals (segment, captured_at);
+CREATE INDEX IF NOT EXISTS idx_signals_org_name ON signals (org_name, captured_at);
+CREATE INDEX IF NOT EXISTS idx_signals_source_channel ON signals (source_channel, captured_at);
+CREATE TABLE IF NOT EXISTS ingested (
+    partition TEXT PRIMARY KEY,
+    offset    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clusters (
+    signal_id  TEXT PRIMARY KEY,
+    cluster_id TEXT NOT NULL,
+    minhash    BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band_key  INTEGER NOT NULL,
+    signal_id TEXT NOT NULL    -- cluster heads only
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band_key);
+"""
+
+def _last_record(conn, signal_id):
+    row = conn.execute("SELECT record FROM signals WHERE signal_id = ? ORDER BY captured_at DESC LIMIT 1",
+                       (signal_id,)).fetchone()
+    return row[0] if row else None
+
+def sync(conn, archive_root=signal_archive.ARCHIVE_DIR):
+    """
+    Ingest whatever was appended to the archive since the last sync. A
+    re-sighting line is stored as its signal's last full record captured
+    again, so every row of the signals table is a whole record.
+    """
+    matcher = signal_index.ensure(conn)
+    offsets = dict(conn.execute("SELECT partition, offset FROM ingested"))
+    added = 0
+    # one transaction for the whole sync: a commit per partition costs more
+    # than the inserts once the archive spans many days
+    with conn:
+        for path in signal_archive.partitions(root=archive_root):
+            key = path.as_posix()
+            size = path.stat().st_size
+            start = offsets.get(key, 0)
+            if size < start:
+                # a restored store that saw bytes this checkout doesn't have:
+                # read the file again (rows already stored are ignored)
+                start = 0
+            if size <= start:
+                continue
+            rows = []
+            # partitions only grow by whole gzip members, so the size seen
+            # last time is where the new members start
+            for line in signal_files.iter_lines(path, start):
+                r = json.loads(line)
+                if signal_archive.is_sighting(r):
+                    # earlier partitions are already inserted (same transaction)
+                    base = _last_record(conn, r["signal_id"])
+                    if base is None:
+                        continue
+                    r = signal_archive.merge(json.loads(base), r["last_seen"])
+                    record = json.dumps(r, ensure_ascii=False)
+                else:
+                    record = line.decode("utf-8")
+                rows.append((
+                    r["signal_id"], r.get("captured_at", ""), r.get("segment"),
+                    r.get("source_channel"), r.get("source_type"), r.get("org_name"),
+                    record,
+                ))
+            conn.executemany("INSERT OR IGNORE INTO signals VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            signal_index.update(conn, [(r[0], r[1], r[6]) for r in rows], matcher)
+            conn.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?)", (key, size))
+            added += len(rows)
+    cluster_new(conn)
+    return added
+
+def _candidates(conn, keys):
+    rows = conn.execute(f"""
+        SELECT DISTINCT c.signal_id, c.cluster_id, c.minhash
+        FROM lsh_buckets b JOIN clusters c ON c.signal_id = b.signal_id
+        WHERE b.band_key IN ({",".join("?" * len(keys))})
+        LIMIT {near_dupes.MAX_CANDIDATES}
+    """, keys)
+    return [(sid, cid, array("I", blob)) for sid, cid, blob in rows]
+
+def cluster_new(conn):
+    """Assign a cluster_id to every signal_id that has none, oldest first."""
+    pending = conn.execute("""
+        SELECT s.signal_id, s.record, MIN(s.captured_at) AS first_seen FROM signals s
+        LEFT JOIN clusters c ON c.signal_id = s.signal_id
+        WHERE c.signal_id IS NULL
+        GROUP BY s.signal_id ORDER BY first_seen
+    """).fetchall()
+    with conn:
+        for signal_id, record, _ in pending:
+            sig = json.loads(record)
+            minhash = near_dupes.signature(sig)
+            if not near_dupes.clusterable(sig):
+                conn.execute("INSERT INTO clusters VALUES (?, ?, ?)", (signal_id, signal_id, minhash.tobytes()))
+                continue
+            keys = near_dupes.band_keys(minhash)
+            cluster_id = near_dupes.best_cluster(minhash, _candidates(conn, keys)) or signal_id
+            conn.execute("INSERT INTO clusters VALUES (?, ?, ?)", (signal_id, cluster_id, minhash.tobytes()))
+            if cluster_id == signal_id:
+                conn.executemany("INSERT INTO lsh_buckets VALUES (?, ?)", [(k, signal_id) for k in keys])
+    return len(pending)
+
+def connect(db_path=DB_FILE, archive_root=signal_archive.ARCHIVE_DIR):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    sync(conn, archive_root)
+    return conn
+
+def _bound(value, end=False):
+    # dates are whole days: an end date includes everything captured that day
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        if end:
+            value = value + timedelta(days=1)
+        return datetime.combine(value, time.min).isoformat()
+    return value
+
+def signals_between(start=None, end=None, segment=None, source_channel=None, org_name=None, conn=None):
+    """
+    Signals captured in [start, end], one per signal_id (its latest capture),
+    oldest first, as SignalRecords. start/end are dates (inclusive) or datetimes.
+    """
+    own = conn is None
+    if own:
+        conn = connect()
+
+    where, params = [], []
+    if start is not None:
+        where.append("captured_at >= ?")
+        params.append(_bound(start))
+    if end is not None:
+        where.append("captured_at < ?" if isinstance(end, date) and not isinstance(end, datetime) else "captured_at <= ?")
+        params.append(_bound(end, end=True))
+    for col, val in (("segment", segment), ("source_channel", source_channel), ("org_name", org_name)):
+        if val is not None:
+            where.append(f"{col} = ?")
+            params.append(val)
+
+    sql = f"""
+        SELECT r.record, c.cluster_id FROM (
+            SELECT signal_id, record, captured_at,
+                   ROW_NUMBER() OVER (PARTITION BY signal_id ORDER BY captured_at DESC) AS rn
+            FROM signals {"WHERE " + " AND ".join(where) if where else ""}
+        ) r LEFT JOIN clusters c ON c.signal_id = r.signal_id
+        WHERE r.rn = 1 ORDER BY r.captured_at
+    """
+    try:
+        out = []
+        for rec, cluster_id in conn.execute(sql, params):
+            sig = json.loads(rec)
+            out.append(SignalRecord.from_dict(sig, cluster_id=cluster_id or sig["signal_id"]))
+        return out
+    finally:
+        if own:
+            conn.close()
+
+if __name__ == "__main__":
+    conn = connect()
+    n = conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+    print(f"{DB_FILE}: {n} signal captures indexed")
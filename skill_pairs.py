@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from array import array
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+import near_dupes
+import signals as signal_store
+from signal_record import SignalRecord
+from time_index import as_of_from_argv
+
+# Which skills are asked for together, overall, per segment and per org.
+#
+# A window's signals (one per near-duplicate cluster per day) are encoded as
+# a sparse binary signal x skill matrix X in CSR form, skill names mapped to
+# small integer ids. Co-occurrence is X^T X restricted to a group's rows:
+# cell (i, j) counts signals asking for both skills i and j, and the diagonal
+# holds each skill's own count. Lift compares a pair with chance,
+#   lift(a, b) = n * C[a, b] / (C[a, a] * C[b, b])
+# so lift > 1 means the two skills turn up together more than their
+# individual frequencies would predict.
+#
+# Each day's matrices are cached in CACHE_FILE under a hash of that day's
+# signals; a weekly window is the sum of its daily matrices, and only days
+# whose signals changed (in practice, today) are rebuilt. The daily and
+# weekly reports can build windows at the same time, so a window holds
+# _cache_lock from reading the cache to writing it back, and the file is
+# replaced whole; a cache that can't be read is rebuilt.
+
+CACHE_FILE = "skill_pairs_cache.json"
+CACHE_DAYS = 62           # days kept in the cache
+MIN_PAIR_SIGNALS = 3      # pairs seen fewer times are too noisy to rank
+TOP_K = 5
+MATRIX_VERSION = 2        # part of each day's cache key; bump when day_matrices changes
+
+def group_keys(sig):
+    keys = ["total"]
+    if sig.get("segment") in ("largecap", "midcap"):
+        keys.append(sig["segment"])
+    if sig.get("org_name"):
+        keys.append(f"org:{sig['org_name']}")
+    return keys
+
+def encode(signals, vocab, ids):
+    """
+    CSR signal x skill matrix: row r's skill ids are
+    indices[indptr[r]:indptr[r + 1]], sorted. New skills are appended to
+    vocab (ids maps name -> id), so ids stay stable across calls.
+    """
+    indptr = array("I", [0])
+    indices = array("H")
+    for s in signals:
+        cols = set()
+        for skill in s.get("skill_hits", []):
+            if skill not in ids:
+                ids[skill] = len(vocab)
+                vocab.append(skill)
+            cols.add(ids[skill])
+        indices.extend(sorted(cols))
+        indptr.append(len(indices))
+    return indptr, indices
+
+def cooccurrence(indptr, indices, rows):
+    """X^T X over the given rows, upper triangle: {(i, j): n} with i <= j."""
+    cells = Counter()
+    for r in rows:
+        cols = indices[indptr[r]:indptr[r + 1]]
+        for a, i in enumerate(cols):
+            for j in cols[a:]:
+                cells[(i, j)] += 1
+    return cells
+
+def _key_line(s):
+    if isinstance(s, SignalRecord):
+        return f"{s.signal_id}|{s.captured_at}|{','.join(s.skill_hits or ())}"
+    return f"{s.get('signal_id')}|{s.get('captured_at')}|{','.join(s.get('skill_hits', []))}"
+
+def day_key(signals):
+    digest = hashlib.sha1(f"v{MATRIX_VERSION}\n".encode("utf-8"))
+    for line in sorted(map(_key_line, signals)):
+        digest.update(f"{line}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def day_matrices(signals, vocab, ids):
+    """{group: (signals in group, co-occurrence cells)} for one day's signals."""
+    # fetch errors are not signals anyone asked for skills in
+    reps = [s for s in near_dupes.representatives(signals) if near_dupes.clusterable(s)]
+    indptr, indices = encode(reps, vocab, ids)
+    rows = defaultdict(list)
+    for r, s in enumerate(reps):
+        for g in group_keys(s):
+            rows[g].append(r)
+    return {g: (len(rs), cooccurrence(indptr, indices, rs)) for g, rs in rows.items()}
+
+def stem(skill):
+    # "llms" / "llm" and the pattern label "agents?" are the same skill
+    return skill.rstrip("?").rstrip("s")
+
+class SkillPairs:
+    """Summed co-occurrence matrices for a window, per group."""
+
+    def __init__(self, vocab, groups):
+        self.vocab = vocab
+        self.groups = groups   # group -> (signals, Counter {(i, j): n})
+
+    def signals(self, group="total"):
+        return self.groups.get(group, (0, None))[0]
+
+    def pairs(self, group="total", k=TOP_K, min_signals=MIN_PAIR_SIGNALS):
+        """Top k (skill_a, skill_b, signals, lift), by lift then support."""
+        n, cells = self.groups.get(group, (0, Counter()))
+        found = []
+        for (i, j), c in cells.items():
+            if i == j or c < min_signals or stem(self.vocab[i]) == stem(self.vocab[j]):
+                continue
+            lift = n * c / (cells[(i, i)] * cells[(j, j)])
+            found.append((self.vocab[i], self.vocab[j], c, lift))
+        found.sort(key=lambda p: (-p[3], -p[2], p[0], p[1]))
+        return found[:k]
+
+_cache_lock = threading.Lock()
+
+def _load_cache(cache_file):
+    if cache_file and Path(cache_file).exists():
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = None
+        if isinstance(cache, dict) and "vocab" in cache and "days" in cache:
+            return cache
+    return {"vocab": [], "days": {}}
+
+def _save_cache(cache_file, cache):
+    tmp = Path(cache_file).with_name(Path(cache_file).name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp, cache_file)
+
+def _to_json(matrices):
+    return {g: {"n": n, "cells": [[i, j, c] for (i, j), c in sorted(cells.items())]}
+            for g, (n, cells) in matrices.items()}
+
+def window(signals, cache_file=None):
+    """
+    SkillPairs over signals (e.g. a TimeIndex window), reusing cached days.
+    cache_file defaults to CACHE_FILE; "" disables the cache.
+    """
+    cache_file = CACHE_FILE if cache_file is None else cache_file
+    by_day = defaultdict(list)
+    for s in signals:
+        by_day[str(s.get("captured_at", ""))[:10]].append(s)
+
+    with _cache_lock:
+        cache = _load_cache(cache_file)
+        vocab = cache["vocab"]
+        ids = {skill: i for i, skill in enumerate(vocab)}
+        groups = {}
+        dirty = False
+        for day in sorted(by_day):
+            key = day_key(by_day[day])
+            entry = cache["days"].get(day)
+            if not entry or entry["key"] != key:
+                entry = {"key": key, "groups": _to_json(day_matrices(by_day[day], vocab, ids))}
+                cache["days"][day] = entry
+                dirty = True
+            for g, m in entry["groups"].items():
+                n, cells = groups.get(g, (0, Counter()))
+                for i, j, c in m["cells"]:
+                    cells[(i, j)] += c
+                groups[g] = (n + m["n"], cells)
+
+        if cache_file and dirty:
+            keep = sorted(cache["days"])[-CACHE_DAYS:]
+            cache["days"] = {day: cache["days"][day] for day in keep}
+            _save_cache(cache_file, cache)
+    return SkillPairs(vocab, groups)
+
+def describe(pairs):
+    return ", ".join(f"{a} + {b} ({n} signals, lift {lift:.1f})" for a, b, n, lift in pairs)
+
+def summary(result, k=TOP_K):
+    """Top pairs per segment and org, JSON-ready for report artifacts."""
+    return {g: [[a, b, n, round(lift, 3)] for a, b, n, lift in result.pairs(g, k)]
+            for g in sorted(result.groups) if result.pairs(g, k)}
+
+def pairs_paragraph(result, k=3):
+    """A short report paragraph on the strongest pairs, or "" when there are none."""
+    top = result.pairs("total", k)
+    if not top:
+        return ""
+    lines = [f"Skills that travel together more often than their individual frequency predicts: {describe(top)}."]
+    for segment in ("largecap", "midcap"):
+        seg = result.pairs(segment, k)
+        if seg:
+            lines.append(f"In {segment} postings: {describe(seg)}.")
+    return " ".join(lines)
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    days = int(argv[argv.index("--days") + 1]) if "--days" in argv else 7
+    as_of = as_of_from_argv(argv)
+    result = window(signal_store.signals_between(as_of - timedelta(days=days - 1), as_of))
+    print(f"skill pairs over {days} days to {as_of} ({result.signals()} signals)")
+    for group in ["total", "largecap", "midcap"] + sorted(g for g in result.groups if g.startswith("org:")):
+        pairs = result.pairs(group)
+        if pairs:
+            print(f"  {group}: {describe(pairs)}")
@@ -0,0 +1,149 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fetch_policy  # noqa: E402
+
+URL = "https://host.example/jobs"
+
+class FakeClock:
+    """Stands in for the time module: sleep() only moves monotonic() on."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    """Answers with the given outcomes in order: a status code or an exception to raise."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(*outcome) if isinstance(outcome, tuple) else FakeResponse(outcome)
+
+class PolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patches = [mock.patch.object(fetch_policy, "time", self.clock),
+                   mock.patch.object(fetch_policy.random, "uniform", lambda lo, hi: hi)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        fetch_policy.reset()
+        self.addCleanup(fetch_policy.reset)
+
+    def send(self, session, deadline=None):
+        return fetch_policy.send(URL, session.get, deadline)
+
+class TokenBucketTest(PolicyTest):
+    def test_burst_then_rate(self):
+        bucket = fetch_policy.TokenBucket(rate=2.0, burst=3)
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.slept, [])
+        bucket.acquire()
+        self.assertEqual(self.clock.slept, [0.5])
+        self.clock.now += 10
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.slept, [0.5])   # refilled, but only up to burst
+
+class RetryTest(PolicyTest):
+    def test_backoff_then_success(self):
+        session = FakeSession(503, fetch_policy.requests.ConnectionError("reset"), 200)
+        self.assertEqual(self.send(session).status_code, 200)
+        self.assertEqual(self.clock.slept, [fetch_policy.BACKOFF_BASE, fetch_policy.BACKOFF_BASE * 2])
+
+    def test_retry_after(self):
+        session = FakeSession((429, {"Retry-After": "7"}), 200)
+        self.assertEqual(self.send(session).status_code, 200)
+        self.assertEqual(self.clock.slept, [7.0])
+
+    def test_retry_after_capped_and_unusable(self):
+        self.assertEqual(fetch_policy.backoff(0, fetch_policy.retry_after_seconds("3600")), fetch_policy.MAX_RETRY_AFTER)
+        self.assertIsNone(fetch_policy.retry_after_seconds("soon"))
+        self.assertEqual(fetch_policy.retry_after_seconds("Thu, 01 Jan 1970 00:00:00 GMT"), 0.0)
+
+    def test_attempts_run_out(self):
+        session = FakeSession(503, 503, 503)
+        self.assertEqual(self.send(session).status_code, 503)
+        self.assertEqual(session.calls, fetch_policy.MAX_ATTEMPTS)
+
+    def test_deadline_stops_retries(self):
+        session = FakeSession(fetch_policy.requests.Timeout("slow"), 200)
+        with self.assertRaises(fetch_policy.requests.Timeout):
+            self.send(session, deadline=self.clock.now + 0.5)
+        self.assertEqual(session.calls, 1)
+
+class BreakerTest(PolicyTest):
+    def open_breaker(self):
+        breaker = fetch_policy.host_state("host.example")[1]
+        for _ in range(fetch_policy.BREAKER_FAILURES):
+            breaker.failure()
+        return breaker
+
+    def test_closed_open_half_open_closed(self):
+        breaker = self.open_breaker()
+        session = FakeSession(200, 200)
+        with self.assertRaises(fetch_policy.CircuitOpen):
+            self.send(session)
+        self.assertEqual(session.calls, 0)
+
+        self.clock.now += fetch_policy.BREAKER_COOLDOWN
+        self.assertEqual(self.send(session).status_code, 200)   # the half-open trial
+        self.assertIsNone(breaker.opened_at)
+        self.assertEqual(self.send(session).status_code, 200)
+
+    def test_failed_trial_reopens(self):
+        breaker = self.open_breaker()
+        self.clock.now += fetch_policy.BREAKER_COOLDOWN
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())   # one trial per cooldown
+        breaker.failure()
+        self.assertFalse(breaker.trial)
+        self.assertFalse(breaker.allow())
+        self.clock.now += fetch_policy.BREAKER_COOLDOWN
+        self.assertTrue(breaker.allow())
+
+    def test_trial_raising_other_exception_reopens(self):
+        breaker = self.open_breaker()
+        self.clock.now += fetch_policy.BREAKER_COOLDOWN
+        session = FakeSession(ValueError("bad payload"), 200)
+        with self.assertRaises(ValueError):
+            self.send(session)
+        self.assertFalse(breaker.trial)
+        self.clock.now += fetch_policy.BREAKER_COOLDOWN
+        self.assertEqual(self.send(session).status_code, 200)
+
+    def test_429_is_not_a_failure(self):
+        breaker = fetch_policy.host_state("host.example")[1]
+        self.send(FakeSession(429, 429, 429))
+        self.assertEqual(breaker.failures, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import html_text  # noqa: E402
+
+class ExtractTextTest(unittest.TestCase):
+    def test_escaped_and_raw_html(self):
+        escaped = "&lt;p&gt;Use &lt;a href=&quot;https://x.example/?a=1&amp;amp;b=2&quot;&gt;RAG&lt;/a&gt;&amp;nbsp;now&lt;/p&gt;"
+        self.assertEqual(html_text.extract_text(escaped), "Use RAG now")
+        self.assertEqual(html_text.extract_text("<div><p>LLM</p><br/>evals</div>"), "LLM evals")
+
+    def test_script_and_style_dropped(self):
+        self.assertEqual(html_text.extract_text("<p>a</p><script>var x = '<p>';</script><style>p{}</style>b"), "a b")
+        self.assertEqual(html_text.extract_text("&lt;p&gt;a&lt;style&gt;.x{}&lt;/style&gt;b&lt;/p&gt;"), "a b")
+
+    def test_stray_brackets_are_text(self):
+        self.assertEqual(html_text.extract_text("x < y and y > z"), "x < y and y > z")
+        self.assertEqual(html_text.extract_text("<p>1 &lt; 2 and 3 &gt; 2</p>"), "1 < 2 and 3 > 2")
+        self.assertEqual(html_text.extract_text("&lt;p&gt;a &amp;lt; b&lt;/p&gt;"), "a < b")
+
+    def test_plain_text_keeps_markup_characters(self):
+        self.assertEqual(html_text.plain_text("C++ <3\n\n  a&lt;b"), "C++ <3 a&lt;b")
+
+    def test_limit(self):
+        text = html_text.extract_text("<p>" + "word " * 10000 + "</p>", limit=100)
+        self.assertEqual(len(text), 100)
+
+    def test_pathological_inputs_are_bounded(self):
+        for raw in ("5 &lt; 6 " * 40000, "5 < 6 " * 40000, "<p>" + "5 &lt; 6 " * 40000,
+                    "&lt;p " * 100000, "<a" * 300000, "<script>" + "x" * 500000):
+            start = time.perf_counter()
+            html_text.extract_text(raw)
+            self.assertLess(time.perf_counter() - start, 0.5, raw[:20])
+
+if __name__ == "__main__":
+    unittest.main()
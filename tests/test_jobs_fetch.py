@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jobs_fetch  # noqa: E402
+
+def posting(job_id, title, version="v1"):
+    job = {
+        "id": job_id,
+        "title": title,
+        "absolute_url": f"https://boards.example/jobs/{job_id}",
+        "location": {"name": "Bengaluru, India"},
+        "content": "",
+    }
+    if version:
+        job["updated_at"] = version
+    else:
+        job["createdAt"] = 1750000000000   # like Lever: never changes
+    return job
+
+class FakeBoard:
+    """A Greenhouse board that honours ETags and can be taken down."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.down = False
+        self.revision = 0
+
+    def change(self, jobs):
+        self.jobs = jobs
+        self.revision += 1
+
+    def fetch(self, url, board_state=None):
+        if self.down:
+            raise jobs_fetch.requests.ConnectionError("board unreachable")
+        etag = f'"r{self.revision}"'
+        if (board_state or {}).get("etag") == etag:
+            return None, board_state
+        return iter(list(self.jobs)), dict(board_state or {}, etag=etag, content_hash=etag)
+
+class BoardTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        Path("targets.json").write_text(
+            '{"segment": "midcap", "greenhouse": [{"name": "Acme", "board_url": "https://boards.example/acme"}]}',
+            encoding="utf-8")
+        self.state = {"boards": {}}
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_once(self, board, due=None):
+        with mock.patch.object(jobs_fetch, "fetch_greenhouse", board.fetch):
+            jobs_fetch.process_targets("targets.json", "signals.jsonl.gz", max_workers=1, state=self.state, due=due)
+        signals = list(jobs_fetch.signal_archive.read_snapshot("signals.jsonl.gz"))
+        return [s for s in signals if s["source_type"] == "job_posting"]
+
+class CarryOverAfterErrorTest(BoardTest):
+    def test_unchanged_board_after_error(self):
+        board = FakeBoard([posting(1, "LLM Engineer"), posting(2, "GenAI Product Manager"), posting(3, "Accountant")])
+        self.assertEqual(len(self.run_once(board)), 2)
+        self.assertEqual(len(self.run_once(board)), 2)   # 304: carried over
+        board.down = True
+        self.assertEqual(self.run_once(board), [])
+        board.down = False
+        self.assertEqual(len(self.run_once(board)), 2)
+        self.assertEqual(len(self.run_once(board)), 2)
+
+    def test_changed_board_after_error(self):
+        board = FakeBoard([posting(1, "LLM Engineer"), posting(2, "GenAI Product Manager")])
+        self.assertEqual(len(self.run_once(board)), 2)
+        board.down = True
+        self.run_once(board)
+        board.down = False
+        board.change(board.jobs + [posting(4, "Sales Lead")])
+        titles = sorted(s["title"] for s in self.run_once(board))
+        self.assertEqual(titles, ["GenAI Product Manager", "LLM Engineer"])
+
+class PostingVersionTest(BoardTest):
+    def test_edit_without_update_time(self):
+        board = FakeBoard([posting(1, "LLM Engineer", version=None)])
+        self.assertEqual([s["title"] for s in self.run_once(board)], ["LLM Engineer"])
+        board.change([posting(1, "GenAI Engineer", version=None)])
+        self.assertEqual([s["title"] for s in self.run_once(board)], ["GenAI Engineer"])
+
+class LostSnapshotTest(BoardTest):
+    def test_corrupt_snapshot(self):
+        board = FakeBoard([posting(1, "LLM Engineer"), posting(2, "GenAI Product Manager")])
+        self.assertEqual(len(self.run_once(board)), 2)
+        Path("signals.jsonl.gz").write_bytes(b"\x1f\x8b not gzip")
+        self.assertEqual(len(self.run_once(board)), 2)   # same ETag, but nothing to carry over
+        self.assertEqual(len(self.run_once(board)), 2)
+
+    def test_missing_snapshot_board_not_due(self):
+        board = FakeBoard([posting(1, "LLM Engineer")])
+        self.assertEqual(len(self.run_once(board)), 1)
+        Path("signals.jsonl.gz").unlink()
+        self.assertEqual(len(self.run_once(board, due=set())), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import random
+import re
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import html_text  # noqa: E402
+import jobs_fetch  # noqa: E402
+import synthetic  # noqa: E402
+from keyword_matcher import KeywordMatcher, theme_matcher  # noqa: E402
+
+THEMES = json.loads((ROOT / "THEME_REGISTRY.json").read_text(encoding="utf-8"))
+
+def sample_texts():
+    rng = random.Random(7)
+    texts = [html_text.extract_text(synthetic.description(rng, 4)) for _ in range(40)]
+    texts += [
+        "Send your CV by email; HTML and XML a plus.",
+        "AI-first GenAI team building LLM agents, RAG and retrieval evals.",
+        "Responsible AI lead: guardrails, model risk, governance and compliance.",
+        "Agentic workflows, prompt engineering and prompts for copilots.",
+        "Trainings for frontline managers; role redesign and job architecture.",
+        "Asterisk-free text about the airline's maildrop.",
+    ]
+    return texts
+
+class BoundaryTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher.from_keywords({"ai": ["ai", "ml", "generative ai"], "risk": ["risk"]})
+
+    def test_whole_word(self):
+        self.assertEqual(self.matcher.scan("Send it by email"), set())
+        self.assertEqual(self.matcher.scan("HTML templates"), set())
+        self.assertEqual(self.matcher.scan("AI-first teams"), {"ai"})
+        self.assertEqual(self.matcher.scan("(ML)"), {"ai"})
+        self.assertEqual(self.matcher.scan("risky bets"), set())
+
+    def test_case_insensitive(self):
+        self.assertEqual(self.matcher.scan("Generative AI"), {"ai"})
+
+    def test_empty(self):
+        self.assertEqual(self.matcher.scan(""), set())
+        self.assertEqual(self.matcher.scan(None), set())
+        self.assertEqual(KeywordMatcher({}).scan("ai"), set())
+
+class MultiLabelTest(unittest.TestCase):
+    def test_overlapping_terms_all_count(self):
+        matcher = KeywordMatcher.from_keywords({"ai": ["ai"], "trust": ["responsible ai"], "resp": ["responsible"]})
+        self.assertEqual(matcher.scan("responsible AI"), {"ai", "trust", "resp"})
+
+    def test_one_term_several_labels(self):
+        matcher = KeywordMatcher.from_keywords({"a": ["governance"], "b": ["governance", "risk"]})
+        self.assertEqual(matcher.scan("data governance"), {"a", "b"})
+
+    def test_job_text(self):
+        self.assertEqual(jobs_fetch.match_job_text("Python, SQL and LLM evals with guardrails"),
+                         (["guardrails?", "llm", "python", "sql"], True))
+        self.assertEqual(jobs_fetch.match_job_text("Reply by email"), ([], False))
+
+class ThemeMatcherTest(unittest.TestCase):
+    def test_leading_boundary_stems(self):
+        matcher = theme_matcher({"agents": {"keywords": ["agent"]}, "risk": {"keywords": ["risk"]}})
+        self.assertEqual(matcher.scan("agentic workflows"), {"agents"})
+        self.assertEqual(matcher.scan("an asterisk"), set())
+        self.assertEqual(matcher.scan("risks and agents"), {"agents", "risk"})
+
+class ParityTest(unittest.TestCase):
+    """The single pass agrees with one search per keyword/pattern."""
+
+    def test_skills_and_ai(self):
+        for text in sample_texts():
+            t = text.lower()
+            skills = sorted(label for label, pat in jobs_fetch.SKILL_LABELS.items() if re.search(pat, t))
+            ai = any(re.search(rf"\b{re.escape(k)}\b", t) for k in jobs_fetch.AI_KEYWORDS)
+            self.assertEqual(jobs_fetch.match_job_text(text), (skills, ai), text)
+
+    def test_themes(self):
+        matcher = theme_matcher(THEMES)
+        for text in sample_texts():
+            t = text.lower()
+            expected = {theme for theme, cfg in THEMES.items()
+                        if any(re.search(rf"\b{re.escape(k.lower())}", t) for k in cfg["keywords"])}
+            self.assertEqual(matcher.scan(text), expected, text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import near_dupes  # noqa: E402
+import signal_archive  # noqa: E402
+import signals as signal_store  # noqa: E402
+
+INTRO = ("Acme is a fintech company building payments infrastructure for millions of small businesses "
+         "across India. We value ownership, clear writing and shipping iteratively with a small team. ")
+
+def job(title, body, city="Bengaluru", org="Acme", day="2026-08-20", source_type="job_posting"):
+    slug = f"{org}-{title}-{city}".lower().replace(" ", "-")
+    return {
+        "captured_at": f"{day}T02:00:00", "segment": "midcap", "source_channel": "ats_jobs",
+        "source_type": source_type, "org_name": org, "title": title, "snippet": body,
+        "link": f"https://boards.example/{slug}",
+    }
+
+def error(org, day="2026-08-20"):
+    sig = job("ERROR fetching Lever jobs", "503 Server Error: Service Unavailable for url", org=org, day=day,
+              source_type="error")
+    sig["link"] = f"https://api.lever.co/v0/postings/{org.lower()}"
+    return sig
+
+class AssignTest(unittest.TestCase):
+    def test_identical_reposts_cluster(self):
+        body = INTRO + "You will build LLM evaluation pipelines and guardrails for our support agents."
+        sigs = [job("GenAI Engineer", body, "Bengaluru"), job("GenAI Engineer", body, "Pune")]
+        self.assertEqual(near_dupes.assign_clusters(sigs), 1)
+        self.assertEqual(len(near_dupes.representatives(sigs)), 1)
+
+    def test_shared_boilerplate_different_titles(self):
+        sigs = [job("GenAI Engineer", INTRO + "Build retrieval and evaluation for LLM features."),
+                job("Account Executive", INTRO + "Own a book of enterprise accounts in the west region.")]
+        self.assertEqual(near_dupes.assign_clusters(sigs), 2)
+
+    def test_same_title_different_companies(self):
+        sigs = [job("GenAI Engineer", INTRO + "Build retrieval for LLM features.", org="Acme"),
+                job("GenAI Engineer", "Globex runs logistics software for ports and shipping lines worldwide; "
+                    "you will own forecasting models end to end.", org="Globex")]
+        self.assertEqual(near_dupes.assign_clusters(sigs), 2)
+
+    def test_errors_stay_singletons(self):
+        sigs = [error("Acme"), error("Globex"), error("Initech")]
+        self.assertEqual(near_dupes.assign_clusters(sigs), 3)
+        self.assertFalse(any(near_dupes.clusterable(s) for s in sigs))
+
+    def test_existing_cluster_ids_kept(self):
+        sigs = [dict(job("GenAI Engineer", INTRO), cluster_id="c1"), job("GenAI Engineer", INTRO, "Pune")]
+        near_dupes.assign_clusters(sigs)
+        self.assertEqual(sigs[0]["cluster_id"], "c1")
+
+class StoreClustersTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def clusters(self, db="signals.db"):
+        conn = signal_store.connect(db, archive_root="archive")
+        try:
+            return dict(conn.execute("SELECT signal_id, cluster_id FROM clusters"))
+        finally:
+            conn.close()
+
+    def test_stable_across_resync(self):
+        body = INTRO + "You will build LLM evaluation pipelines and guardrails for our support agents."
+        day1 = [job("GenAI Engineer", body, "Bengaluru"), job("GenAI Engineer", body, "Pune"),
+                job("Account Executive", INTRO + "Own enterprise accounts."), error("Acme"), error("Globex")]
+        signal_archive.append_signals("ats_midcap", day1, root="archive")
+        first = self.clusters()
+        self.assertEqual(len(set(first.values())), 4)
+
+        day2 = [dict(s, captured_at="2026-08-21T02:00:00") for s in day1]
+        day2.append(job("GenAI Engineer", body, "Mumbai", day="2026-08-21"))
+        signal_archive.append_signals("ats_midcap", day2, root="archive")
+        second = self.clusters()
+        self.assertEqual({sid: second[sid] for sid in first}, first)
+        self.assertEqual(len(set(second.values())), 4)   # the Mumbai copy joins its cluster
+
+        self.assertEqual(self.clusters("rebuilt.db"), second)
+
+if __name__ == "__main__":
+    unittest.main()
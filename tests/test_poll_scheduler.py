@@ -0,0 +1,44 @@
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import poll_scheduler  # noqa: E402
+
+URL = "https://boards.example/acme"
+
+class DailyBoardTest(unittest.TestCase):
+    def test_due_every_run_at_default_interval(self):
+        # last_polled is stamped when the fetch ends, a few minutes after
+        # the run started; the next day's run must still pick the board up
+        run = datetime(2026, 8, 20, 1, 30)
+        poll = None
+        for day in range(5):
+            now = run + timedelta(days=day)
+            boards = {URL: {"poll": poll}} if poll else {}
+            self.assertEqual(poll_scheduler.plan([URL], boards, now=now), {URL}, f"day {day}")
+            poll = poll_scheduler.record(poll, now + timedelta(minutes=5), None, 1, 2.0)
+
+    def test_not_due_well_before_interval(self):
+        now = datetime(2026, 8, 20, 1, 30)
+        poll = poll_scheduler.record(None, now - timedelta(hours=6), None, 1, 2.0)
+        self.assertEqual(poll_scheduler.plan([URL], {URL: {"poll": poll}}, now=now), set())
+
+class IntervalTest(unittest.TestCase):
+    def test_no_shorter_than_run_gap(self):
+        self.assertEqual(poll_scheduler.interval_hours(100.0), 24 / poll_scheduler.RUNS_PER_DAY)
+        self.assertEqual(poll_scheduler.interval_hours(0), poll_scheduler.MAX_INTERVAL_H)
+
+class BudgetTest(unittest.TestCase):
+    def test_cheaper_boards_fill_the_budget(self):
+        now = datetime(2026, 8, 20, 1, 30)
+        def board(hours_ago, requests):
+            poll = poll_scheduler.record(None, now - timedelta(hours=hours_ago), None, requests, 1.0)
+            return {"poll": dict(poll, requests=requests)}
+        boards = {"a": board(72, 5), "big": board(60, 50), "c": board(48, 5)}
+        self.assertEqual(poll_scheduler.plan(["a", "big", "c"], boards, now=now, budget=20), {"a", "c"})
+
+if __name__ == "__main__":
+    unittest.main()
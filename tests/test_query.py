@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import query  # noqa: E402
+import signal_archive  # noqa: E402
+import signals as signal_store  # noqa: E402
+
+def term(value, prefix=False):
+    return ("term", value, prefix)
+
+class ParseTest(unittest.TestCase):
+    def test_precedence(self):
+        # NOT binds tighter than AND, AND tighter than OR
+        self.assertEqual(query.parse("a b OR NOT c d"), ("or", [
+            ("and", [term("word:a"), term("word:b")]),
+            ("and", [("not", term("word:c")), term("word:d")]),
+        ]))
+        self.assertEqual(query.parse("a (b OR c)"), ("and", [term("word:a"), ("or", [term("word:b"), term("word:c")])]))
+
+    def test_fields_prefix_and_minus(self):
+        self.assertEqual(query.parse("skill:guard* -type:error"),
+                         ("and", [term("skill:guard", True), ("not", term("type:error"))]))
+        self.assertEqual(query.parse('company:"Acme Corp"'), term("org:acme corp"))
+        self.assertEqual(query.parse("skill:guardrails?"), term("skill:guardrails"))
+
+    def test_empty(self):
+        self.assertIsNone(query.parse("   "))
+
+    def test_incomplete(self):
+        for text in ("(", "a OR", "NOT", "a (b OR"):
+            with self.assertRaises(SystemExit) as cm:
+                query.parse(text)
+            self.assertEqual(str(cm.exception), "incomplete query", text)
+
+    def test_unexpected(self):
+        for text in ("()", "OR a", "a OR OR b", "a)"):
+            with self.assertRaises(SystemExit) as cm:
+                query.parse(text)
+            self.assertIn("unexpected", str(cm.exception), text)
+
+def posting(title, org, day, skills=(), location="Bengaluru, India"):
+    return {
+        "captured_at": f"{day}T02:00:00", "segment": "midcap", "source_channel": "ats_jobs",
+        "source_type": "job_posting", "org_name": org, "title": title, "snippet": "",
+        "link": f"https://boards.example/{org}/{title}".lower().replace(" ", "-"),
+        "notes": f"greenhouse; location={location}; team=; created_at=", "skill_hits": list(skills),
+    }
+
+class IndexTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def search(self, text, start=None, end=None):
+        conn = signal_store.connect("signals.db", archive_root="archive")
+        try:
+            ids = query.search(conn, text, start, end)
+            rows = conn.execute("SELECT signal_id, org_name FROM index_docs").fetchall()
+            return sorted(org for sid, org in rows if sid in ids)
+        finally:
+            conn.close()
+
+    def test_search_and_recapture(self):
+        signal_archive.append_signals("ats_midcap", [
+            posting("GenAI Engineer", "Acme", "2026-08-20", ["python", "guardrails?"]),
+            posting("Data Analyst", "Globex", "2026-08-20", ["sql"], location="Pune, India"),
+            posting("Prompt Engineer", "Initech", "2026-08-20", ["prompt"], location="Remote"),
+        ], root="archive")
+        self.assertEqual(self.search("skill:guardrails"), ["Acme"])
+        self.assertEqual(self.search("engineer -org:acme"), ["Initech"])
+        self.assertEqual(self.search("skill:p*"), ["Acme", "Initech"])
+        self.assertEqual(self.search("loc:pune OR loc:remote"), ["Globex", "Initech"])
+
+        # Acme's posting is re-captured with new content; Globex's is seen again unchanged
+        signal_archive.append_signals("ats_midcap", [
+            posting("GenAI Engineer", "Acme", "2026-08-21", ["sql"]),
+            posting("Data Analyst", "Globex", "2026-08-21", ["sql"], location="Pune, India"),
+        ], root="archive")
+        self.assertEqual(self.search("skill:guardrails"), [])
+        self.assertEqual(self.search("skill:sql"), ["Acme", "Globex"])
+        self.assertEqual(self.search("skill:sql", start=date(2026, 8, 21), end=date(2026, 8, 21)), ["Acme", "Globex"])
+        self.assertEqual(self.search("", end=date(2026, 8, 20)), ["Initech"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rss_fetch  # noqa: E402
+
+FEEDS = [("McKinsey", "https://feeds.example/mckinsey")]
+
+class FakeFeed:
+    """A feed that answers 304 to a matching ETag and can be taken down."""
+
+    def __init__(self):
+        self.down = False
+
+    def fetch(self, session, feed_url, feed_state, timeout=None, name=None):
+        if self.down:
+            raise rss_fetch.requests.ConnectionError("feed unreachable")
+        if feed_state.get("etag") == '"r0"':
+            return None, feed_state
+        return [{"title": "The state of AI", "summary": "", "link": "https://feeds.example/a"}], {"etag": '"r0"'}
+
+class CarryOverAfterErrorTest(unittest.TestCase):
+    def test_unchanged_feed_after_error(self):
+        feed = FakeFeed()
+        state, previous, counts = {}, [], []
+        with mock.patch.object(rss_fetch, "fetch_feed", feed.fetch):
+            for down in (False, False, True, False, False):
+                feed.down = down
+                previous = rss_fetch.fetch_feeds(FEEDS, state=state, previous=previous)
+                counts.append(len(previous))
+        self.assertEqual(counts, [1, 1, 0, 1, 1])
+
+if __name__ == "__main__":
+    unittest.main()
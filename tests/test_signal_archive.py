@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import signal_archive  # noqa: E402
+import signal_files  # noqa: E402
+import signals as signal_store  # noqa: E402
+
+def posting(key, day, title=None):
+    return {
+        "captured_at": f"{day}T02:00:00", "segment": "midcap", "source_channel": "ats_jobs",
+        "source_type": "job_posting", "org_name": f"Org {key}", "title": title or f"GenAI Engineer {key}",
+        "snippet": "", "link": f"https://boards.example/jobs/{key}", "notes": "greenhouse; location=Pune; team=",
+    }
+
+class ArchiveCase(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.ids = {k: signal_archive.signal_id(posting(k, "2026-08-18")) for k in "ABC"}
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+class ArchiveTest(ArchiveCase):
+    def build(self):
+        # A is re-sighted unchanged for two days; B changes on the 19th; C is new on the 19th
+        days = [
+            ("2026-08-18", [posting("A", "2026-08-18"), posting("B", "2026-08-18")]),
+            ("2026-08-19", [posting("A", "2026-08-19"), posting("B", "2026-08-19", "LLM Engineer B"),
+                            posting("C", "2026-08-19")]),
+            ("2026-08-20", [posting("A", "2026-08-20"), posting("C", "2026-08-20")]),
+        ]
+        for _, sigs in days:
+            signal_archive.append_signals("ats_midcap", sigs, root="archive")
+        # the same signals again the same day add nothing
+        self.assertEqual(signal_archive.append_signals("ats_midcap", days[-1][1], root="archive"), 0)
+
+    def lines(self, day):
+        return list(signal_files.iter_records(Path("archive/ats_midcap") / f"{day}{signal_files.SUFFIX}"))
+
+    def test_sightings_on_disk(self):
+        self.build()
+        day19 = {r["signal_id"]: r for r in self.lines("2026-08-19")}
+        self.assertTrue(signal_archive.is_sighting(day19[self.ids["A"]]))
+        self.assertEqual(day19[self.ids["B"]]["title"], "LLM Engineer B")
+        self.assertEqual(day19[self.ids["C"]]["first_seen"], "2026-08-19T02:00:00")
+        self.assertTrue(all(signal_archive.is_sighting(r) for r in self.lines("2026-08-20")))
+
+    def test_read_window_looks_back(self):
+        self.build()
+        window = {r["signal_id"]: r for r in signal_archive.read_window(date(2026, 8, 20), date(2026, 8, 20))}
+        self.assertEqual(set(window), {self.ids["A"], self.ids["C"]})
+        a = window[self.ids["A"]]   # full record two days before the window
+        self.assertEqual((a["title"], a["captured_at"], a["first_seen"]),
+                         ("GenAI Engineer A", "2026-08-20T02:00:00", "2026-08-18T02:00:00"))
+
+        window = {r["signal_id"]: r for r in signal_archive.read_window(date(2026, 8, 19), date(2026, 8, 20))}
+        self.assertEqual(window[self.ids["B"]]["title"], "LLM Engineer B")
+        self.assertEqual(window[self.ids["B"]]["captured_at"], "2026-08-19T02:00:00")
+
+    def test_store_matches_window(self):
+        self.build()
+        conn = signal_store.connect("signals.db", archive_root="archive")
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0], 7)
+            for start in (date(2026, 8, 18), date(2026, 8, 19), date(2026, 8, 20)):
+                stored = signal_store.signals_between(start, date(2026, 8, 20), conn=conn)
+                archived = signal_archive.read_window(start, date(2026, 8, 20))
+                key = lambda r: (r["signal_id"], r["title"], r["captured_at"])
+                self.assertEqual(sorted(map(key, stored)), sorted(map(key, archived)), start)
+        finally:
+            conn.close()
+
+class MigrateTest(ArchiveCase):
+    def test_round_trip(self):
+        Path("archive/rss").mkdir(parents=True)
+        records = [dict(posting(k, "2026-08-18"), signal_id=self.ids[k]) for k in "AB"]
+        Path("archive/rss/2026-08-18.jsonl").write_text(
+            "".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+        snapshot = [posting("B", "2026-08-18"), posting("A", "2026-08-18")]
+        Path("rss_signals.json").write_text(json.dumps(snapshot), encoding="utf-8")
+
+        signal_archive.migrate("archive")
+
+        self.assertFalse(Path("archive/rss/2026-08-18.jsonl").exists())
+        self.assertFalse(Path("rss_signals.json").exists())
+        self.assertEqual(list(signal_files.iter_records(Path("archive/rss/2026-08-18.jsonl.gz"))), records)
+        migrated = list(signal_archive.read_snapshot("rss_signals.jsonl.gz"))
+        self.assertEqual([s["org_name"] for s in migrated], ["Org A", "Org B"])   # sorted
+        self.assertEqual(sorted(json.dumps(s, sort_keys=True) for s in migrated),
+                         sorted(json.dumps(s, sort_keys=True) for s in snapshot))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import bisect
+import sys
+from datetime import date, datetime, time, timedelta
+
+class TimeIndex:
+    """
+    Signals sorted by capture time, with captured_at parsed once. Windows are
+    answered by binary search; the bounds are [start, end) datetimes, or
+    whole days for the *_dates helpers.
+    """
+
+    def __init__(self, signals):
+        keyed = []
+        self.skipped = 0
+        for s in signals:
+            try:
+                keyed.append((datetime.fromisoformat(s.get("captured_at", "")), s))
+            except (TypeError, ValueError):
+                self.skipped += 1
+        keyed.sort(key=lambda pair: pair[0])
+        self.times = [t for t, _ in keyed]
+        self.signals = [s for _, s in keyed]
+
+    def __len__(self):
+        return len(self.signals)
+
+    def between(self, start=None, end=None):
+        lo = bisect.bisect_left(self.times, start) if start else 0
+        hi = bisect.bisect_left(self.times, end) if end else len(self.times)
+        return self.signals[lo:hi]
+
+    def between_dates(self, first_day, last_day):
+        """Signals captured on any day from first_day to last_day inclusive."""
+        return self.between(day_start(first_day), day_start(last_day + timedelta(days=1)))
+
+    def last_days(self, n, as_of):
+        """The n calendar days ending on as_of (n=1 is just as_of)."""
+        return self.between_dates(as_of - timedelta(days=n - 1), as_of)
+
+    def iso_week(self, year, week):
+        monday = date.fromisocalendar(year, week, 1)
+        return self.between_dates(monday, monday + timedelta(days=6))
+
+    def as_of(self, d):
+        """Everything captured up to the end of day d."""
+        return self.between(None, day_start(d + timedelta(days=1)))
+
+def day_start(d):
+    return datetime.combine(d, time.min)
+
+def as_of_from_argv(argv=None):
+    """--as-of YYYY-MM-DD from the command line, else today (UTC)."""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--as-of" in argv:
+        i = argv.index("--as-of")
+        if i + 1 < len(argv):
+            return date.fromisoformat(argv[i + 1])
+        raise SystemExit("--as-of needs a date (YYYY-MM-DD)")
+    return datetime.utcnow().date()
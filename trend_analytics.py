@@ -0,0 +1,202 @@
+import hashlib
+import json
+import math
+import sys
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+import trend_store
+from time_index import as_of_from_argv
+
+# Week-over-week analytics over the weekly theme snapshots in trend_history/.
+# Counts are loaded into one dense weeks x themes x segments cube, stored as a
+# flat array of doubles (row w holds every theme/segment cell of week w), and
+# each derived measure is a cube of the same shape computed a whole week-row
+# at a time:
+#   delta         count minus the previous week's
+#   rolling_mean  mean over the last ROLLING_WEEKS weeks
+#   momentum      EWMA of delta (ALPHA weight on the newest week)
+#   zscore        count against the mean/stdev of the previous Z_WEEKS weeks
+# The derived cubes are cached in CACHE_FILE, keyed by the names, sizes and
+# mtimes of the snapshot files they came from (a stat per week, no reads), so
+# reports reuse them until a snapshot changes.
+# Only the latest run of weeks counted the same way (trend_store.method) is
+# used: a delta or z-score across a change of counting method would report
+# the change, not the trend.
+
+SEGMENTS = ("total", "largecap", "midcap")
+ROLLING_WEEKS = 4
+Z_WEEKS = 8
+MIN_Z_WEEKS = 3        # fewer baseline weeks than this: z-score stays 0
+ALPHA = 0.5
+Z_THRESHOLD = 2.0
+
+CACHE_FILE = "trend_analytics_cache.json"
+MEASURES = ("counts", "delta", "rolling_mean", "momentum", "zscore")
+
+class TrendCube:
+    """Dense weeks x themes x segments values in one flat array('d')."""
+
+    def __init__(self, weeks, themes, values=None):
+        self.weeks = list(weeks)
+        self.themes = list(themes)
+        self.width = len(self.themes) * len(SEGMENTS)
+        self.values = values if values is not None else array("d", bytes(8 * len(self.weeks) * self.width))
+
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        themes = []
+        for snap in snapshots:
+            for theme in snap["themes"]:
+                if theme not in themes:
+                    themes.append(theme)
+        cube = cls([snap["week"] for snap in snapshots], themes)
+        for w, snap in enumerate(snapshots):
+            for theme, counts in snap["themes"].items():
+                base = cube.cell(w, cube.themes.index(theme), 0)
+                for s, seg in enumerate(SEGMENTS):
+                    cube.values[base + s] = counts.get(seg, 0)
+        return cube
+
+    def cell(self, w, t, s):
+        return w * self.width + t * len(SEGMENTS) + s
+
+    def row(self, w):
+        return self.values[w * self.width:(w + 1) * self.width]
+
+    def get(self, week, theme, segment="total"):
+        return self.values[self.cell(self.weeks.index(week), self.themes.index(theme), SEGMENTS.index(segment))]
+
+    def like(self):
+        return TrendCube(self.weeks, self.themes)
+
+def derive(counts):
+    """{measure: TrendCube} for every measure in MEASURES."""
+    out = {name: counts.like() for name in MEASURES[1:]}
+    out["counts"] = counts
+    width = counts.width
+    prev = array("d", bytes(8 * width))
+    momentum = array("d", bytes(8 * width))
+    window_sum = array("d", bytes(8 * width))
+    for w in range(len(counts.weeks)):
+        row = counts.row(w)
+        delta = array("d", [x - p for x, p in zip(row, prev)]) if w else array("d", bytes(8 * width))
+        momentum = array("d", [ALPHA * d + (1 - ALPHA) * m for d, m in zip(delta, momentum)]) if w else delta
+        window_sum = array("d", [a + x for a, x in zip(window_sum, row)])
+        if w >= ROLLING_WEEKS:
+            window_sum = array("d", [a - x for a, x in zip(window_sum, counts.row(w - ROLLING_WEEKS))])
+        rolling = array("d", [a / min(w + 1, ROLLING_WEEKS) for a in window_sum])
+
+        base = [counts.row(b) for b in range(max(0, w - Z_WEEKS), w)]
+        if len(base) >= MIN_Z_WEEKS:
+            n = len(base)
+            means = [sum(col) / n for col in zip(*base)]
+            stdevs = [math.sqrt(sum((v - m) ** 2 for v in col) / n) for col, m in zip(zip(*base), means)]
+            z = array("d", [(x - m) / sd if sd else 0.0 for x, m, sd in zip(row, means, stdevs)])
+        else:
+            z = array("d", bytes(8 * width))
+
+        lo, hi = w * width, (w + 1) * width
+        out["delta"].values[lo:hi] = delta
+        out["momentum"].values[lo:hi] = momentum
+        out["rolling_mean"].values[lo:hi] = rolling
+        out["zscore"].values[lo:hi] = z
+        prev = row
+    return out
+
+class TrendAnalytics:
+    """
+    Derived measures over the snapshots of completed weeks. dropped is how
+    many earlier weeks were left out for a different counting method.
+    """
+
+    def __init__(self, measures, dropped=0):
+        self.measures = measures
+        self.cube = measures["counts"]
+        self.dropped = dropped
+
+    @property
+    def latest_week(self):
+        return self.cube.weeks[-1] if self.cube.weeks else None
+
+    def latest(self, measure, theme, segment="total"):
+        return self.measures[measure].get(self.latest_week, theme, segment)
+
+    def accelerating(self, segment="total", limit=3):
+        """Themes whose count rose last week and whose momentum is positive, fastest first."""
+        if not self.latest_week:
+            return []
+        rising = [(self.latest("momentum", t, segment), t) for t in self.cube.themes
+                  if self.latest("delta", t, segment) > 0 and self.latest("momentum", t, segment) > 0]
+        return [t for _, t in sorted(rising, reverse=True)[:limit]]
+
+    def anomalies(self, segment="total", threshold=Z_THRESHOLD):
+        """(theme, z) for last week's counts at least threshold stdevs from their baseline."""
+        if not self.latest_week:
+            return []
+        found = [(t, self.latest("zscore", t, segment)) for t in self.cube.themes]
+        return sorted([(t, z) for t, z in found if abs(z) >= threshold], key=lambda tz: -abs(tz[1]))
+
+def comparable(snapshots):
+    """The trailing snapshots that share the latest one's counting method."""
+    if not snapshots:
+        return []
+    last = trend_store.method(snapshots[-1])
+    start = len(snapshots)
+    while start and trend_store.method(snapshots[start - 1]) == last:
+        start -= 1
+    return snapshots[start:]
+
+def completed_weeks(as_of, root=trend_store.HISTORY_DIR):
+    current = trend_store.week_key(as_of)
+    return [k for k in trend_store.week_keys(root) if k < current]
+
+def history_key(as_of, root=trend_store.HISTORY_DIR):
+    """Hash of the names, sizes and mtimes of the snapshot files load(as_of) reads."""
+    digest = hashlib.sha256()
+    for key in completed_weeks(as_of, root):
+        st = (Path(root) / f"{key}.json").stat()
+        digest.update(f"{key}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def load(as_of=None, root=trend_store.HISTORY_DIR, cache_file=CACHE_FILE):
+    """
+    Analytics over every completed ISO week before as_of's week (the running
+    week is still being counted), from the cache when the snapshots match.
+    """
+    as_of = as_of or datetime.utcnow().date()
+    keys = completed_weeks(as_of, root)
+    cache_key = history_key(as_of, root)
+
+    cache = Path(cache_file) if cache_file else None
+    if cache and cache.exists():
+        with open(cache, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == cache_key and "dropped" in cached:
+            measures = {name: TrendCube(cached["weeks"], cached["themes"], array("d", cached[name]))
+                        for name in MEASURES}
+            return TrendAnalytics(measures, cached["dropped"])
+
+    snapshots = trend_store.load_range(None, keys[-1], root) if keys else []
+    used = comparable(snapshots)
+    measures = derive(TrendCube.from_snapshots(used))
+    dropped = len(snapshots) - len(used)
+    if cache:
+        counts = measures["counts"]
+        payload = {"key": cache_key, "weeks": counts.weeks, "themes": counts.themes, "dropped": dropped}
+        payload.update({name: [round(v, 6) for v in measures[name].values] for name in MEASURES})
+        with open(cache, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+    return TrendAnalytics(measures, dropped)
+
+if __name__ == "__main__":
+    analytics = load(as_of_from_argv(sys.argv[1:]))
+    print(f"latest completed week: {analytics.latest_week}"
+          f" ({len(analytics.cube.weeks)} comparable, {analytics.dropped} earlier weeks counted another way)")
+    for theme in analytics.cube.themes:
+        print(f"  {theme}: count={analytics.latest('counts', theme):.0f} "
+              f"delta={analytics.latest('delta', theme):+.0f} "
+              f"momentum={analytics.latest('momentum', theme):+.1f} "
+              f"z={analytics.latest('zscore', theme):+.2f}")
+    print(f"accelerating: {', '.join(analytics.accelerating()) or 'none'}")
@@ -1,68 +1,140 @@
 import json
-from datetime import datetime
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
 
-SIGNAL_FILES = [
-    "rss_signals.json",
-    "ats_jobs_largecap_signals.json",
-    "ats_jobs_midcap_signals.json"
-]
+import metrics
+import near_dupes
+import signals as signal_store
+import trend_store
+from keyword_matcher import theme_matcher
+from time_index import as_of_from_argv, day_start
 
 THEME_FILE = "THEME_REGISTRY.json"
-OUTPUT_FILE = "trend_history.json"
 
-def load_json(path):
+# Running state for the current week: which signals are already counted and
+# up to when, so a re-run only scores what was captured since.
+STATE_FILE = "trend_evolution_state.json"
+
+SEGMENTS = ["other", "largecap", "midcap"]
+SEGMENT_CODES = {name: i for i, name in enumerate(SEGMENTS)}
+
+def load_json(path, default=None):
     if not Path(path).exists():
-        return []
+        return [] if default is None else default
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def detect_themes(text, theme_registry):
-    hits = []
-    t = (text or "").lower()
-    for theme, cfg in theme_registry.items():
-        if any(k in t for k in cfg["keywords"]):
-            hits.append(theme)
-    return hits
+def build_theme_matcher(theme_registry):
+    return theme_matcher(theme_registry)
+
+def detect_themes(text, theme_registry, matcher=None):
+    if matcher is None:
+        matcher = build_theme_matcher(theme_registry)
+    found = matcher.scan(text)
+    return [theme for theme in theme_registry if theme in found]
+
+def theme_hit_matrix(signals, themes, matcher):
+    """
+    Score every signal once into a sparse signal x theme matrix in CSR form:
+    row i's theme columns are indices[indptr[i]:indptr[i + 1]]. cells holds
+    segment_code * len(themes) + column for each hit, ready for reduction.
+    """
+    col = {theme: j for j, theme in enumerate(themes)}
+    indptr = array("I", [0])
+    indices = array("H")
+    cells = array("I")
+    width = len(themes)
+    for s in signals:
+        found = matcher.scan(f"{s.get('title','')} {s.get('snippet','')}")
+        seg = SEGMENT_CODES.get(s.get("segment"), 0)
+        for j in sorted(col[t] for t in found):
+            indices.append(j)
+            cells.append(seg * width + j)
+        indptr.append(len(indices))
+    return indptr, indices, cells
 
-def main():
+def segment_counts(indices, cells, themes):
+    """Per-theme total/largecap/midcap counts, reduced over the hit arrays."""
+    width = len(themes)
+    totals = Counter(indices)
+    per_cell = Counter(cells)
+    counts = {}
+    for j, theme in enumerate(themes):
+        if not totals[j]:
+            continue
+        counts[theme] = {
+            "total": totals[j],
+            "largecap": per_cell[SEGMENT_CODES["largecap"] * width + j],
+            "midcap": per_cell[SEGMENT_CODES["midcap"] * width + j],
+        }
+    return counts
+
+def merge_counts(base, extra):
+    merged = {theme: dict(c) for theme, c in base.items()}
+    for theme, c in extra.items():
+        into = merged.setdefault(theme, {"total": 0, "largecap": 0, "midcap": 0})
+        for k, v in c.items():
+            into[k] = into.get(k, 0) + v
+    return merged
+
+def main(incremental=True, as_of=None, index=None):
+    """
+    Update the snapshot of as_of's week (default: today) with the signals
+    captured up to the end of as_of. index is a TimeIndex covering the week
+    (the pipeline's); without one the signals are read from the store.
+    """
     theme_registry = load_json(THEME_FILE)
     if not theme_registry:
         raise ValueError("Theme registry missing or empty")
 
-    all_signals = []
-    for f in SIGNAL_FILES:
-        all_signals.extend(load_json(f))
+    themes = list(theme_registry)
+    matcher = build_theme_matcher(theme_registry)
+
+    as_of = as_of or datetime.utcnow().date()
+    end = day_start(as_of + timedelta(days=1))
+    week_key = trend_store.week_key(as_of)
+    week_start = trend_store.week_start(week_key)
 
-    week_key = datetime.utcnow().strftime("%Y-W%U")
+    state = load_json(STATE_FILE, {})
+    if (not incremental or state.get("week") != week_key or state.get("themes") != themes
+            or state.get("method") != trend_store.COUNT_METHOD):
+        state = {"week": week_key, "themes": themes, "method": trend_store.COUNT_METHOD, "scored_through": None,
+                 "counted": [], "clusters": [], "counts": {}}
 
-    weekly_counts = defaultdict(lambda: {
-        "total": 0,
-        "largecap": 0,
-        "midcap": 0
-    })
+    # only signals captured since the last snapshot (and not yet counted this
+    # week) are scored; the result is merged into the running weekly counts.
+    # A near-duplicate cluster counts once per week, however many copies;
+    # fetch errors are not counted at all.
+    since = datetime.fromisoformat(state["scored_through"]) if state["scored_through"] else day_start(week_start)
+    counted = set(state["counted"])
+    clusters = set(state["clusters"])
+    window = index.between(since, end) if index is not None else signal_store.signals_between(since, end)
+    fresh = [s for s in window if s["signal_id"] not in counted and s["captured_at"] < end.isoformat()]
+    scored = [s for s in near_dupes.representatives(fresh)
+              if s["cluster_id"] not in clusters and near_dupes.clusterable(s)]
 
-    for s in all_signals:
-        text = f"{s.get('title','')} {s.get('snippet','')}"
-        themes = detect_themes(text, theme_registry)
-        for theme in themes:
-            weekly_counts[theme]["total"] += 1
-            if s.get("segment") == "largecap":
-                weekly_counts[theme]["largecap"] += 1
-            elif s.get("segment") == "midcap":
-                weekly_counts[theme]["midcap"] += 1
+    _, indices, cells = theme_hit_matrix(scored, themes, matcher)
+    metrics.count("trend_evolution", records_in=len(fresh), clusters=len(scored), theme_hits=len(indices))
+    merged = merge_counts(state["counts"], segment_counts(indices, cells, themes))
+    weekly_counts = {theme: merged[theme] for theme in themes if theme in merged}
 
-    history = load_json(OUTPUT_FILE)
-    history.append({
-        "week": week_key,
-        "themes": weekly_counts
-    })
+    state["counts"] = weekly_counts
+    state["counted"] = sorted(counted.union(s["signal_id"] for s in fresh))
+    state["clusters"] = sorted(clusters.union(s["cluster_id"] for s in scored))
+    state["scored_through"] = max([s["captured_at"] for s in fresh] + [state["scored_through"] or ""]) or None
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2)
+    trend_store.upsert_week(week_key, weekly_counts)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f)
 
-    print(f"Trend snapshot saved for {week_key}")
+    print(f"Trend snapshot saved for {week_key} ({len(fresh)} new signals, {len(scored)} new clusters scored)")
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("trend_evolution"):
+            main(incremental="--full" not in sys.argv[1:], as_of=as_of_from_argv())
+    finally:
+        metrics.write()
@@ -0,0 +1,89 @@
+import bisect
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Weekly theme snapshots, one compact file per ISO week:
+#   trend_history/2026-W34.json  ->  {"week": "2026-W34", "method": "clusters", "themes": {...}}
+# Writing a week touches only that file (upsert), and a week is read by name.
+# method says what a count counts; weeks counted differently are not
+# comparable (see trend_analytics):
+#   rows      signal rows in one day's snapshot files (untagged, migrated weeks)
+#   clusters  distinct near-duplicate clusters captured since Monday, fetch
+#             errors excluded (trend_evolution)
+
+HISTORY_DIR = "trend_history"
+LEGACY_FILE = "trend_history.json"
+COUNT_METHOD = "clusters"
+LEGACY_METHOD = "rows"
+
+def week_key(d):
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def week_start(key):
+    return date.fromisocalendar(int(key[:4]), int(key[6:]), 1)
+
+def week_keys(root=HISTORY_DIR):
+    base = Path(root)
+    if not base.exists():
+        return []
+    return sorted(p.stem for p in base.glob("*-W*.json"))
+
+def method(snapshot):
+    return snapshot.get("method", LEGACY_METHOD)
+
+def upsert_week(key, themes, root=HISTORY_DIR, method=COUNT_METHOD):
+    base = Path(root)
+    base.mkdir(parents=True, exist_ok=True)
+    entry = {"week": key, "method": method, "themes": themes}
+    with open(base / f"{key}.json", "w", encoding="utf-8") as f:
+        json.dump(entry, f, separators=(",", ":"), ensure_ascii=False)
+        f.write("\n")
+    return entry
+
+def load_week(key, root=HISTORY_DIR):
+    path = Path(root) / f"{key}.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_range(start_key=None, end_key=None, root=HISTORY_DIR):
+    """Snapshots for ISO weeks in [start_key, end_key], oldest first."""
+    keys = week_keys(root)
+    lo = bisect.bisect_left(keys, start_key) if start_key else 0
+    hi = bisect.bisect_right(keys, end_key) if end_key else len(keys)
+    return [load_week(k, root) for k in keys[lo:hi]]
+
+def latest(root=HISTORY_DIR):
+    keys = week_keys(root)
+    return load_week(keys[-1], root) if keys else None
+
+def legacy_to_iso(key):
+    # legacy keys were strftime("%Y-W%U") from a Friday run; W00 and the
+    # Sunday-start weeks map onto the ISO week containing that Friday
+    friday = datetime.strptime(f"{key}-5", "%Y-W%U-%w").date()
+    return week_key(friday)
+
+def migrate_legacy(path=LEGACY_FILE, root=HISTORY_DIR):
+    """One-time import of trend_history.json; a later duplicate week wins."""
+    if not Path(path).exists():
+        print(f"{path} not found, nothing to migrate")
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    weeks = {}
+    for entry in history:
+        weeks[legacy_to_iso(entry["week"])] = entry["themes"]
+    for key, themes in weeks.items():
+        upsert_week(key, themes, root, method=LEGACY_METHOD)
+    print(f"Migrated {len(history)} snapshots into {len(weeks)} ISO weeks -> {root}/")
+    return len(weeks)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate_legacy()
+    else:
+        print("usage: python trend_store.py migrate")
@@ -1,52 +1,32 @@
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import Counter
 
-TODAY = datetime.utcnow().date()
-WEEK_START = TODAY - timedelta(days=7)
+import metrics
+import near_dupes
+import reports
+import signal_record
+import signals as signal_store
+import skill_pairs
+from time_index import TimeIndex, as_of_from_argv
 
-FILES = [
-    "rss_signals.json",
-    "ats_jobs_largecap_signals.json",
-    "ats_jobs_midcap_signals.json"
-]
+WINDOW_DAYS = 8   # the week ending today, plus the same weekday last week
 
 TEMPLATE_FILE = "WEEKLY_CXO_SYNTHESIS_TEMPLATE.md"
 OUTPUT_FILE = "weekly_cxo_synthesis.md"
 
-def load_signals():
-    signals = []
-    for f in FILES:
-        if Path(f).exists():
-            with open(f, "r", encoding="utf-8") as fh:
-                try:
-                    signals.extend(json.load(fh))
-                except Exception:
-                    pass
-    return signals
-
-def is_this_week(sig):
-    try:
-        d = datetime.fromisoformat(sig.get("captured_at", "")).date()
-        return d >= WEEK_START
-    except Exception:
-        return False
-
-def main():
-    # Ensure template exists
-    if not Path(TEMPLATE_FILE).exists():
-        raise FileNotFoundError(f"Missing template file: {TEMPLATE_FILE}")
-
-    signals = [s for s in load_signals() if is_this_week(s)]
+def load_signals(as_of):
+    # indexed window query; each signal once, at its latest capture
+    start = as_of - timedelta(days=WINDOW_DAYS - 1)
+    return TimeIndex(signal_store.signals_between(start, as_of))
 
+def build_sections(signals):
+    """(sections, counts) for the synthesis over signals."""
+    metrics.count("weekly_cxo_synthesis", records_in=len(signals))
     largecap = [s for s in signals if s.get("segment") == "largecap"]
     midcap = [s for s in signals if s.get("segment") == "midcap"]
 
-    skill_counter = Counter()
-    for s in signals:
-        for sk in s.get("skill_hits", []):
-            skill_counter[sk] += 1
+    # one count per near-duplicate cluster, not per syndicated copy
+    skill_counter = signal_record.skill_counts(near_dupes.representatives(signals))
 
     # 1) Material change
     material_change = (
@@ -81,6 +61,11 @@ def main():
             "No dominant skill cluster emerged this week. This can indicate early exploration or fragmented experimentation."
         )
 
+    pairs = skill_pairs.window(signals)
+    pairs_text = skill_pairs.pairs_paragraph(pairs)
+    if pairs_text:
+        skills_and_roles = f"{skills_and_roles}\n\n{pairs_text}"
+
     # 5) Watchlist
     watchlist = (
         "- Fully autonomous, agent-driven decision systems\n"
@@ -114,24 +99,45 @@ def main():
         "- Treat whitespace initiatives as strategic experiments, not compliance exercises"
     )
 
-    template = Path(TEMPLATE_FILE).read_text(encoding="utf-8")
-
-    synthesis = (
-        template
-        .replace("{{week_ending}}", TODAY.isoformat())
-        .replace("{{material_change}}", material_change)
-        .replace("{{clarity_statement}}", clarity_statement)
-        .replace("{{segment_divergence}}", segment_divergence)
-        .replace("{{skills_and_roles}}", skills_and_roles)
-        .replace("{{watchlist}}", watchlist)
-        .replace("{{whitespace_opportunities}}", whitespace_opportunities)
-        .replace("{{executive_implications}}", executive_implications)
-        .replace("{{planning_implications}}", planning_implications)
-    )
+    sections = {
+        "material_change": material_change,
+        "clarity_statement": clarity_statement,
+        "segment_divergence": segment_divergence,
+        "skills_and_roles": skills_and_roles,
+        "watchlist": watchlist,
+        "whitespace_opportunities": whitespace_opportunities,
+        "executive_implications": executive_implications,
+        "planning_implications": planning_implications,
+    }
+    counts = {
+        "signals": len(signals),
+        "largecap": len(largecap),
+        "midcap": len(midcap),
+        "top_skills": dict(skill_counter.most_common(6)),
+        "skill_pairs": skill_pairs.summary(pairs),
+    }
+    return sections, counts
+
+def publish(sections, counts, as_of):
+    """Write the synthesis and its JSON artifact; returns the markdown."""
+    return reports.publish(OUTPUT_FILE, TEMPLATE_FILE, "weekly_cxo_synthesis", as_of, sections, counts,
+                           week_ending=as_of.isoformat())
+
+def main(as_of=None):
+    as_of = as_of or datetime.utcnow().date()
+
+    # Ensure template exists
+    if not Path(TEMPLATE_FILE).exists():
+        raise FileNotFoundError(f"Missing template file: {TEMPLATE_FILE}")
 
-    Path(OUTPUT_FILE).write_text(synthesis, encoding="utf-8")
+    signals = load_signals(as_of).last_days(WINDOW_DAYS, as_of)
+    publish(*build_sections(signals), as_of)
     print("Weekly CXO synthesis generated")
 
 if __name__ == "__main__":
-    main()
+    try:
+        with metrics.stage("weekly_cxo_synthesis"):
+            main(as_of_from_argv())
+    finally:
+        metrics.write()
 